@@ -0,0 +1,54 @@
+"""
+Emotion scoring kernels
+Box scaling, dominant emotion, top-3 and traffic light color for all faces in one native call
+"""
+
+import numpy as np
+from _numba_compat import njit
+
+# FER always reports these 7 emotions, in this order
+EMOTION_NAMES = ('angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral')
+POSITIVE_MASK = np.array([0, 0, 0, 1, 0, 1, 0], dtype=np.uint8)
+NEUTRAL_MASK = np.array([0, 0, 0, 0, 0, 0, 1], dtype=np.uint8)
+
+# Color codes returned by the kernels index into this table (BGR)
+TRAFFIC_LIGHT_COLORS = (
+    (0, 255, 0),    # Green
+    (0, 255, 255),  # Yellow
+    (0, 0, 255),    # Red
+)
+
+def scores_matrix(results):
+    """Stack FER result emotions into an (N, 7) float32 matrix in EMOTION_NAMES order"""
+    return np.array([[result['emotions'].get(name, 0.0) for name in EMOTION_NAMES]
+                     for result in results], dtype=np.float32).reshape(-1, len(EMOTION_NAMES))
+
+@njit(cache=True)
+def prep(boxes, scores, inv_scale, pos_mask, neu_mask):
+    """Scale boxes back and score every face in one call
+
+    Returns (int32 boxes, dominant indices, top-3 indices, color codes)
+    """
+    n = boxes.shape[0]
+    out_boxes = np.empty((n, 4), dtype=np.int32)
+    dominant = np.empty(n, dtype=np.int64)
+    top3 = np.empty((n, 3), dtype=np.int64)
+    colors = np.empty(n, dtype=np.int8)
+    for k in range(n):
+        for c in range(4):
+            out_boxes[k, c] = int(boxes[k, c] * inv_scale)
+        idx = scores[k].argmax()
+        dominant[k] = idx
+        # Stable sort on negated scores keeps the first emotion on ties, like sorted()
+        top3[k] = np.argsort(-scores[k], kind='mergesort')[:3]
+        if pos_mask[idx]:
+            colors[k] = 0
+        elif neu_mask[idx]:
+            colors[k] = 1
+        else:
+            colors[k] = 2
+    return out_boxes, dominant, top3, colors
+
+# Compile at import so the first camera frame doesn't pay the JIT cost
+prep(np.zeros((1, 4), dtype=np.float32), np.zeros((1, len(EMOTION_NAMES)), dtype=np.float32),
+     1.0, POSITIVE_MASK, NEUTRAL_MASK)
@@ -0,0 +1,71 @@
+"""
+Face geometry kernel
+All Phase 1 geometry features for one face (or a stack of faces) in a single native call
+"""
+
+import math
+import numpy as np
+from _numba_compat import njit
+
+# Order of the values returned by compute_features()
+FEATURE_NAMES = (
+    'mouth_openness', 'smile_amplitude', 'eye_openness', 'eyebrow_raise',
+    'head_pitch', 'head_yaw', 'head_roll', 'face_depth',
+)
+
+# MediaPipe Face Mesh landmark indices - module-level ints, constant-folded by Numba
+# Reference: https://github.com/google/mediapipe/blob/master/mediapipe/python/solutions/face_mesh.py
+FACE_LEFT, FACE_RIGHT, FACE_TOP, FACE_BOTTOM = 234, 454, 10, 152
+MOUTH_TOP, MOUTH_BOTTOM, MOUTH_LEFT, MOUTH_RIGHT = 13, 14, 61, 291
+LEFT_EYE_TOP, LEFT_EYE_BOTTOM, RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM = 159, 145, 386, 374
+LEFT_EYEBROW_TOP, RIGHT_EYEBROW_TOP = 105, 334
+NOSE_TIP, NOSE_BRIDGE = 1, 168
+
+@njit(cache=True)
+def _dist_xy(lm, a, b):
+    """Euclidean distance between two landmarks using x, y only"""
+    return math.hypot(lm[a, 0] - lm[b, 0], lm[a, 1] - lm[b, 1])
+
+@njit(cache=True, fastmath=True)
+def compute_features(lm):
+    """Return the geometry features of an (N, 3) landmark array in FEATURE_NAMES order"""
+    out = np.empty(len(FEATURE_NAMES), dtype=np.float64)
+
+    # Face size for normalization (avoid division by zero)
+    face_width = max(_dist_xy(lm, FACE_LEFT, FACE_RIGHT), 1.0)
+
+    # Mouth openness
+    out[0] = _dist_xy(lm, MOUTH_TOP, MOUTH_BOTTOM) / face_width
+
+    # Smile amplitude: mouth width ratio + lift of the corners above the mouth center
+    mouth_center_y = (lm[MOUTH_TOP, 1] + lm[MOUTH_BOTTOM, 1]) / 2
+    corner_lift = mouth_center_y - (lm[MOUTH_LEFT, 1] + lm[MOUTH_RIGHT, 1]) / 2
+    out[1] = (_dist_xy(lm, MOUTH_LEFT, MOUTH_RIGHT) + corner_lift) / face_width
+
+    # Eye openness (both eyes)
+    out[2] = (_dist_xy(lm, LEFT_EYE_TOP, LEFT_EYE_BOTTOM) +
+              _dist_xy(lm, RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM)) / (2 * face_width)
+
+    # Eyebrow raise
+    out[3] = ((lm[LEFT_EYE_TOP, 1] - lm[LEFT_EYEBROW_TOP, 1]) +
+              (lm[RIGHT_EYE_TOP, 1] - lm[RIGHT_EYEBROW_TOP, 1])) / (2 * face_width)
+
+    # Head pitch / yaw from the nose, roll from the face outline
+    nose_dx = lm[NOSE_TIP, 0] - lm[NOSE_BRIDGE, 0]
+    nose_dy = lm[NOSE_TIP, 1] - lm[NOSE_BRIDGE, 1]
+    nose_dz = lm[NOSE_TIP, 2] - lm[NOSE_BRIDGE, 2]
+    out[4] = math.atan2(nose_dy, nose_dz)
+    out[5] = math.atan2(nose_dx, nose_dz)
+    out[6] = math.atan2(lm[FACE_RIGHT, 1] - lm[FACE_LEFT, 1], lm[FACE_RIGHT, 0] - lm[FACE_LEFT, 0])
+
+    # Face depth: mean z of the outline points
+    out[7] = (lm[FACE_LEFT, 2] + lm[FACE_RIGHT, 2] + lm[FACE_TOP, 2] + lm[FACE_BOTTOM, 2]) / 4
+    return out
+
+@njit(cache=True)
+def compute_features_batch(lms):
+    """Return an (F, len(FEATURE_NAMES)) feature matrix for an (F, N, 3) landmark stack"""
+    out = np.empty((lms.shape[0], len(FEATURE_NAMES)), dtype=np.float64)
+    for f in range(lms.shape[0]):
+        out[f] = compute_features(lms[f])
+    return out
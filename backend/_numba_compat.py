@@ -0,0 +1,15 @@
+"""
+Optional Numba support
+Kernels decorated with njit run as plain Python/NumPy when Numba is not installed
+"""
+
+NUMBA_AVAILABLE = False
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
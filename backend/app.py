@@ -1,17 +1,30 @@
+import os
+
+# Socket.IO server mode: 'threading' (default) or 'eventlet' for non-blocking websocket writes.
+# eventlet turns the worker threads into green threads, so long OpenCV/model calls
+# hold the hub while they run - opt in with SOCKETIO_ASYNC_MODE=eventlet.
+SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading')
+if SOCKETIO_ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 import cv2
 import numpy as np
-from fer.fer import FER
-import base64
 import time
-from collections import deque, defaultdict
 import threading
-import os
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor
 import warnings
 # adder logger
 import logging
+from frame_utils import encode_jpeg, put_text_cached, draw_landmarks, bgr_to_css
+import socket_json
+from _emotion_kernel import (EMOTION_NAMES, POSITIVE_MASK, NEUTRAL_MASK,
+                             TRAFFIC_LIGHT_COLORS, scores_matrix, prep)
 
 # Suppress macOS AVFoundation warnings for continuity camera
 # This warning is harmless - it's just Apple deprecating the external camera type in favor of continuity cameras
@@ -20,6 +33,8 @@ warnings.filterwarnings('ignore', category=DeprecationWarning)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# Silence per-request access logs from the dev server
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
 
 # Try to import face mesh analyzer (optional feature)
 FACE_MESH_AVAILABLE = False
@@ -34,21 +49,60 @@ except (ImportError, AttributeError) as e:
 
 app = Flask(__name__)
 CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=SOCKETIO_ASYNC_MODE, json=socket_json)
 
-# Initialize emotion detector
-emotion_detector = FER(mtcnn=False)
+# Initialize emotion detector - ONNX Runtime if the exported model is present, FER otherwise
+try:
+    from onnx_emotion_detector import ONNXEmotionDetector
+    emotion_detector = ONNXEmotionDetector()
+    print("✓ ONNX Runtime emotion detector loaded")
+except Exception as e:
+    print(f"⚠️  ONNX emotion detector not available: {e}")
+    print("   Falling back to FER (TensorFlow)...")
+    from fer.fer import FER
+    emotion_detector = FER(mtcnn=False)
 
 # Configuration
 PROCESS_EVERY_N_FRAMES = 3
 INFERENCE_WIDTH = 320
 ROLLING_WINDOW_SIZE = 5
 MIN_CONFIDENCE = 0.25
+MAX_FACES = 16
+# FER needs BGR input; the ONNX detector can take a grayscale frame directly
+INFERENCE_GRAYSCALE = getattr(emotion_detector, 'accepts_grayscale', False)
+# Motion gate: skip detection when the 16x16 gray thumbnail barely changed
+MOTION_THUMB_SIZE = (16, 16)
+MOTION_THRESH = 512  # Sum of absolute differences over 256 pixels (~2 gray levels each)
+MAX_MOTION_SKIPS = 10  # Re-run detection at least every N inference ticks anyway
 
 # Global state
 camera = None
 camera_lock = threading.Lock()
-color_histories = defaultdict(lambda: deque(maxlen=ROLLING_WINDOW_SIZE))
+
+# Per-face color ring buffers for smooth_color (indexed by face slot)
+_color_buf = np.zeros((MAX_FACES, ROLLING_WINDOW_SIZE, 3), dtype=np.int32)
+_color_idx = np.zeros(MAX_FACES, dtype=np.int32)
+_color_cnt = np.zeros(MAX_FACES, dtype=np.int32)
+_color_last = np.zeros(MAX_FACES, dtype=np.int64)  # Frame a slot was last written
+COLOR_SLOT_STALE_FRAMES = 30  # Unused for this long -> history belongs to a departed face
+
+# Capture mode requested from the camera (MJPG keeps USB/driver copies small)
+CAPTURE_WIDTH = 1280
+CAPTURE_HEIGHT = 720
+CAPTURE_FPS = 30
+
+# Camera scan results, reused for CAMERA_CACHE_TTL seconds
+CAMERA_PROBE_COUNT = 5
+CAMERA_CACHE_TTL = 30.0
+_cameras_cache = None
+_cameras_cache_ts = 0.0
+
+# Inference resize buffers, reused until the camera resolution changes
+_resize_key = None
+_resize_dsize = None
+_resize_scale = 1.0
+_small_frame = None
+_gray_frame = None
 
 # Background thread state
 camera_thread = None
@@ -58,42 +112,60 @@ camera_thread_stop_flag = threading.Event()
 mesh_thread = None
 mesh_thread_stop_flag = threading.Event()
 
-def emotion_to_color(emotion):
-    """Map emotion to traffic light color"""
-    positive_emotions = ['happy', 'surprise']
-    neutral_emotions = ['neutral']
-
-    if emotion in positive_emotions:
-        return (0, 255, 0)  # Green
-    elif emotion in neutral_emotions:
-        return (0, 255, 255)  # Yellow
-    else:
-        return (0, 0, 255)  # Red
-
-def get_dominant_emotion(emotions):
-    """Get the emotion with highest confidence"""
-    if not emotions:
-        return 'neutral', 0.0
-    max_emotion = max(emotions.items(), key=lambda x: x[1])
-    return max_emotion[0], max_emotion[1]
-
-def get_top_emotions(emotions, top_n=3):
-    """Get top N emotions sorted by confidence"""
-    sorted_emotions = sorted(emotions.items(), key=lambda x: x[1], reverse=True)
-    return sorted_emotions[:top_n]
-
-def smooth_color(face_id, new_color):
-    """Apply rolling average to stabilize color per face"""
-    color_histories[face_id].append(new_color)
-    avg_color = np.mean(color_histories[face_id], axis=0)
+def reset_color_smoothing():
+    """Clear the per-face color history (frame counts restart with every camera session)"""
+    _color_idx[:] = 0
+    _color_cnt[:] = 0
+    _color_last[:] = 0
+
+def smooth_color(i, new_color, frame_count=0):
+    """Apply rolling average to stabilize color per face slot"""
+    i %= MAX_FACES
+    if frame_count - _color_last[i] > COLOR_SLOT_STALE_FRAMES:
+        _color_idx[i] = 0
+        _color_cnt[i] = 0
+    _color_last[i] = frame_count
+    _color_buf[i, _color_idx[i]] = new_color
+    _color_idx[i] = (_color_idx[i] + 1) % ROLLING_WINDOW_SIZE
+    _color_cnt[i] = min(_color_cnt[i] + 1, ROLLING_WINDOW_SIZE)
+    avg_color = _color_buf[i, :_color_cnt[i]].mean(axis=0)
     return (int(avg_color[0]), int(avg_color[1]), int(avg_color[2]))
 
-def resize_for_inference(frame, target_width=INFERENCE_WIDTH):
-    """Resize frame maintaining aspect ratio for faster processing"""
-    height, width = frame.shape[:2]
-    scale = target_width / width
-    new_height = int(height * scale)
-    return cv2.resize(frame, (target_width, new_height)), scale
+def resize_for_inference(frame, target_width=INFERENCE_WIDTH, grayscale=False):
+    """Resize frame maintaining aspect ratio for faster processing (into reused buffers)"""
+    global _resize_key, _resize_dsize, _resize_scale, _small_frame, _gray_frame
+    key = (frame.shape, target_width, grayscale)
+    if key != _resize_key:
+        # Camera resolution changed (or first frame) - recompute size and buffers once
+        height, width = frame.shape[:2]
+        _resize_scale = target_width / width
+        _resize_dsize = (target_width, int(height * _resize_scale))
+        channels = () if grayscale else frame.shape[2:]
+        _small_frame = np.empty((_resize_dsize[1], target_width) + channels, dtype=np.uint8)
+        _gray_frame = np.empty((height, width), dtype=np.uint8) if grayscale else None
+        _resize_key = key
+
+    if grayscale:
+        # Convert first so the resize touches 1 byte/pixel instead of 3
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=_gray_frame)
+        frame = _gray_frame
+    cv2.resize(frame, _resize_dsize, dst=_small_frame, interpolation=cv2.INTER_AREA)
+    return _small_frame, _resize_scale
+
+def configure_capture(cap):
+    """Request compressed MJPG at a fixed mode and a 1-frame driver buffer"""
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAPTURE_WIDTH)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAPTURE_HEIGHT)
+    cap.set(cv2.CAP_PROP_FPS, CAPTURE_FPS)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    # Drivers may silently fall back to another format/mode - log what we got
+    fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+    fourcc_str = ''.join(chr((fourcc >> (8 * k)) & 0xFF) for k in range(4))
+    logger.info(f"Capture mode: {fourcc_str!r} "
+                f"{int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))} "
+                f"@ {cap.get(cv2.CAP_PROP_FPS):.0f} fps")
 
 def initialize_camera(camera_index=0):
     """Initialize camera"""
@@ -108,8 +180,9 @@ def initialize_camera(camera_index=0):
 
         # Try multiple times to open camera
         for attempt in range(3):
-            camera = cv2.VideoCapture(camera_index)
+            camera = cv2.VideoCapture(camera_index, _camera_backend())
             if camera.isOpened():
+                configure_capture(camera)
                 logger.info(f"✓ Camera {camera_index} opened on attempt {attempt + 1}")
                 return True
             else:
@@ -121,15 +194,28 @@ def initialize_camera(camera_index=0):
         logger.error(f"✗ Failed to open camera {camera_index} after 3 attempts")
         return False
 
+def _put_latest(q, item):
+    """Put item on a 1-slot queue, dropping whatever is still waiting there"""
+    try:
+        q.get_nowait()
+    except queue.Empty:
+        pass
+    q.put_nowait(item)
+
 def camera_loop():
-    """Background thread for camera processing with emotion detection"""
+    """Background thread for camera capture - feeds the inference and encoder workers"""
     global camera
     logger.info("camera_loop() started in background thread")
 
-    frame_count = 0
-    emotion_results = []
-    fps_history = deque(maxlen=30)
-    last_time = time.time()
+    # capture -> inference -> encoder, each stage always works on the freshest item
+    frame_queue = queue.Queue(maxsize=1)
+    encode_queue = queue.Queue(maxsize=1)
+    workers = [
+        threading.Thread(target=inference_worker, args=(frame_queue, encode_queue), daemon=True),
+        threading.Thread(target=encoder_worker, args=(encode_queue,), daemon=True),
+    ]
+    for worker in workers:
+        worker.start()
 
     try:
         while not camera_thread_stop_flag.is_set():
@@ -143,121 +229,164 @@ def camera_loop():
                     logger.error("Failed to read frame from camera")
                     break
 
-            display_frame = frame.copy()
+            _put_latest(frame_queue, frame)
 
-            # Process emotions every N frames
+    except Exception as e:
+        logger.error(f"Error in camera loop: {e}")
+    finally:
+        logger.info("camera_loop() exiting")
+        # End-of-stream marker, the workers pass it down the pipeline and exit
+        _put_latest(frame_queue, None)
+        for worker in workers:
+            worker.join(timeout=2.0)
+        with camera_lock:
+            if camera is not None:
+                try:
+                    camera.release()
+                    logger.info("Camera released in camera_loop()")
+                except Exception as e:
+                    logger.error(f"Error releasing camera in camera_loop: {e}")
+                camera = None
+        logger.info("camera_loop() cleanup complete")
+
+def inference_worker(frame_queue, encode_queue):
+    """Pipeline stage: emotion detection and overlay drawing"""
+    reset_color_smoothing()
+    frame_count = 0
+    faces = []
+    prev_thumb = None
+    skipped = 0
+
+    try:
+        while not camera_thread_stop_flag.is_set():
+            try:
+                frame = frame_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if frame is None:
+                break
+
+            # Process emotions every N frames, unless the scene is static
+            run_detection = False
             if frame_count % PROCESS_EVERY_N_FRAMES == 0:
-                small_frame, scale = resize_for_inference(frame)
+                thumb = cv2.cvtColor(
+                    cv2.resize(frame, MOTION_THUMB_SIZE, interpolation=cv2.INTER_AREA),
+                    cv2.COLOR_BGR2GRAY
+                ).astype(np.int16)
+                if (prev_thumb is None or skipped >= MAX_MOTION_SKIPS
+                        or np.abs(thumb - prev_thumb).sum() >= MOTION_THRESH):
+                    run_detection = True
+                    prev_thumb = thumb
+                    skipped = 0
+                else:
+                    skipped += 1
+
+            if run_detection:
+                small_frame, scale = resize_for_inference(frame, grayscale=INFERENCE_GRAYSCALE)
                 emotion_results = emotion_detector.detect_emotions(small_frame)
 
-                # Scale back coordinates
-                if emotion_results:
-                    for result in emotion_results:
-                        box = result['box']
-                        result['box'] = [
-                            int(box[0] / scale),
-                            int(box[1] / scale),
-                            int(box[2] / scale),
-                            int(box[3] / scale)
-                        ]
+                # Scale back coordinates and score all faces in one kernel call
+                boxes = np.array([result['box'] for result in emotion_results],
+                                 dtype=np.float32).reshape(-1, 4)
+                scores = scores_matrix(emotion_results)
+                face_boxes, dominant, top3, color_codes = prep(
+                    boxes, scores, 1.0 / scale, POSITIVE_MASK, NEUTRAL_MASK
+                )
+                faces = list(zip(face_boxes.tolist(), dominant.tolist(), top3.tolist(),
+                                 color_codes.tolist(), scores.tolist()))
 
             # Prepare emotion data for frontend
             emotions_data = []
 
             # Draw rectangles and labels
-            for i, result in enumerate(emotion_results):
+            for i, (box, idx, face_top3, color_code, face_scores) in enumerate(faces):
                 try:
-                    box = result['box']
-                    emotions = result['emotions']
                     x, y, w, h = box
-
-                    dominant_emotion, confidence = get_dominant_emotion(emotions)
-                    raw_color = emotion_to_color(dominant_emotion)
-                    face_id = f"face_{i}"
-                    color = smooth_color(face_id, raw_color)
+                    dominant_emotion = EMOTION_NAMES[idx]
+                    confidence = face_scores[idx]
+                    color = smooth_color(i, TRAFFIC_LIGHT_COLORS[color_code], frame_count)
 
                     if confidence > MIN_CONFIDENCE:
                         # Draw rectangle
-                        cv2.rectangle(display_frame, (x, y), (x+w, y+h), color, 3)
+                        cv2.rectangle(frame, (x, y), (x+w, y+h), color, 3)
 
                         # Draw emotion label
-                        emotion_text = f"{dominant_emotion.upper()}: {confidence:.2f}"
+                        emotion_text = f"{dominant_emotion.upper()}: {confidence:.1f}"
                         label_y = max(y - 10, 20)
-                        cv2.putText(display_frame, emotion_text, (x, label_y),
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+                        put_text_cached(frame, emotion_text, (x, label_y), 0.7, color, 2)
 
                         # Traffic light indicator
                         circle_x = x + w - 20
                         circle_y = y + 20
-                        cv2.circle(display_frame, (circle_x, circle_y), 15, color, -1)
+                        cv2.circle(frame, (circle_x, circle_y), 15, color, -1)
 
                         # Collect emotion data for WebSocket
-                        top_emotions = get_top_emotions(emotions, 3)
                         emotions_data.append({
                             'id': i,
                             'dominant': dominant_emotion,
                             'confidence': round(confidence, 2),
                             'top_emotions': [
-                                {'emotion': e, 'score': round(s, 2)}
-                                for e, s in top_emotions
+                                {'emotion': EMOTION_NAMES[k], 'score': round(face_scores[k], 2)}
+                                for k in face_top3
                             ],
-                            'color': f"rgb({color[2]}, {color[1]}, {color[0]})"  # Convert BGR to RGB
+                            'color': bgr_to_css(color)  # Convert BGR to RGB
                         })
                 except Exception as e:
-                    print(f"Error processing face {i}: {e}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Error processing face %d: %r", i, e)
                     continue
 
-            # Calculate FPS
+            _put_latest(encode_queue, (frame, emotions_data, len(faces)))
+            frame_count += 1
+
+    except Exception as e:
+        logger.error(f"Error in inference worker: {e}")
+    finally:
+        _put_latest(encode_queue, None)
+
+def encoder_worker(encode_queue):
+    """Pipeline stage: JPEG encoding and WebSocket emit"""
+    logger.info("encoder_worker() started")
+    avg_fps = 0.0
+    last_time = time.time()
+
+    try:
+        while not camera_thread_stop_flag.is_set():
+            try:
+                item = encode_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+
+            display_frame, emotions_data, face_count = item
+
+            # Calculate FPS (exponential moving average)
             current_time = time.time()
-            fps = 1 / (current_time - last_time) if (current_time - last_time) > 0 else 0
-            fps_history.append(fps)
-            avg_fps = np.mean(fps_history)
+            dt = current_time - last_time
+            if dt > 0:
+                avg_fps = 0.9 * avg_fps + 0.1 / dt if avg_fps else 1.0 / dt
             last_time = current_time
 
             # Draw FPS
-            cv2.putText(display_frame, f"FPS: {avg_fps:.1f}", (10, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-            cv2.putText(display_frame, f"Faces: {len(emotion_results)}", (10, 60),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+            put_text_cached(display_frame, f"FPS: {avg_fps:.1f}", (10, 30), 0.6, (0, 255, 0), 2)
+            put_text_cached(display_frame, f"Faces: {face_count}", (10, 60), 0.6, (0, 255, 0), 2)
 
             # Encode frame to JPEG
-            ret, buffer = cv2.imencode('.jpg', display_frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            if not ret:
+            frame_bytes = encode_jpeg(display_frame)
+            if frame_bytes is None:
                 continue
 
-            frame_bytes = buffer.tobytes()
-            frame_base64 = base64.b64encode(frame_bytes).decode('utf-8')
-
-            # Emit frame and emotion data via WebSocket
+            # Emit frame and emotion data via WebSocket (bytes go out as a binary attachment)
             socketio.emit('video_frame', {
-                'frame': frame_base64,
+                'frame': frame_bytes,
                 'emotions': emotions_data,
                 'fps': round(avg_fps, 1),
-                'face_count': len(emotion_results)
+                'face_count': face_count
             })
 
-            frame_count += 1
-
-            # Log first frame
-            if frame_count == 1:
-                logger.info(f"✓ First frame emitted successfully (size: {len(frame_bytes)} bytes)")
-
-            # Small sleep to prevent CPU overload
-            time.sleep(0.01)
-
     except Exception as e:
-        logger.error(f"Error in camera loop: {e}")
-    finally:
-        logger.info("camera_loop() exiting")
-        with camera_lock:
-            if camera is not None:
-                try:
-                    camera.release()
-                    logger.info("Camera released in camera_loop()")
-                except Exception as e:
-                    logger.error(f"Error releasing camera in camera_loop: {e}")
-                camera = None
-        logger.info("camera_loop() cleanup complete")
+        logger.error(f"Error in encoder worker: {e}")
 
 @app.route('/api/health')
 def health_check():
@@ -269,38 +398,58 @@ def health_check():
         'mesh_thread_active': mesh_thread.is_alive() if mesh_thread else False
     })
 
+def _camera_backend():
+    """Native capture backend for this platform, so missing devices fail fast"""
+    if sys.platform.startswith('win'):
+        return cv2.CAP_DSHOW
+    if sys.platform == 'darwin':
+        return cv2.CAP_AVFOUNDATION
+    if sys.platform.startswith('linux'):
+        return cv2.CAP_V4L2
+    return cv2.CAP_ANY
+
+def _probe_camera(i):
+    """Open camera i and read one frame, returns its info dict or None"""
+    try:
+        cap = cv2.VideoCapture(i, _camera_backend())
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        try:
+            if not cap.isOpened():
+                logger.info(f"  Camera {i} not available")
+                return None
+            ret, frame = cap.read()
+            if not ret or frame is None:
+                return None
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            logger.info(f"✓ Camera {i} found: {width}x{height}")
+            return {
+                'id': i,
+                'name': f'Camera {i}',
+                'resolution': f'{width}x{height}'
+            }
+        finally:
+            cap.release()
+    except Exception as e:
+        logger.error(f"Error checking camera {i}: {e}")
+        return None
+
 @app.route('/api/cameras')
 def list_cameras():
     """List available cameras"""
-    logger.info("Scanning for cameras...")
-    cameras = []
+    global _cameras_cache, _cameras_cache_ts
+    now = time.time()
+    if _cameras_cache is not None and now - _cameras_cache_ts < CAMERA_CACHE_TTL:
+        return jsonify(_cameras_cache)
 
-    for i in range(5):
-        try:
-            logger.info(f"Trying camera {i}...")
-            cap = cv2.VideoCapture(i)
-
-            # Set timeout for camera opening
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-
-            if cap.isOpened():
-                ret, frame = cap.read()
-                if ret and frame is not None:
-                    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                    cameras.append({
-                        'id': i,
-                        'name': f'Camera {i}',
-                        'resolution': f'{width}x{height}'
-                    })
-                    logger.info(f"✓ Camera {i} found: {width}x{height}")
-                cap.release()
-            else:
-                logger.info(f"  Camera {i} not available")
-        except Exception as e:
-            logger.error(f"Error checking camera {i}: {e}")
-            continue
+    logger.info("Scanning for cameras...")
+    # Device opens block on the driver, not the CPU - probe all indices at once
+    with ThreadPoolExecutor(max_workers=CAMERA_PROBE_COUNT) as executor:
+        results = executor.map(_probe_camera, range(CAMERA_PROBE_COUNT))
+    cameras = [info for info in results if info is not None]
 
+    _cameras_cache = cameras
+    _cameras_cache_ts = now
     logger.info(f"Found {len(cameras)} camera(s)")
     return jsonify(cameras)
 
@@ -356,7 +505,7 @@ def face_mesh_loop():
         return
 
     frame_count = 0
-    fps_history = deque(maxlen=30)
+    avg_fps = 0.0
     last_time = time.time()
     min_interval = 0.33  # seconds between processed frames (~1/3 frames at 30 FPS)
 
@@ -379,23 +528,18 @@ def face_mesh_loop():
             try:
                 face_data = face_mesh_analyzer.process_frame(frame)
             except Exception as e:
-                print(f"Face mesh error: {e}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Face mesh error: %r", e)
                 face_data = None
 
-            display_frame = frame.copy()
-
             # Draw face mesh overlays
             if face_data:
                 for face in face_data:
-                    landmarks_3d = np.array(face['landmarks_3d'])
                     features = face['geometry_features']
                     color = tuple(face['color'])
 
                     # Draw landmarks
-                    for landmark in landmarks_3d:
-                        x, y = int(landmark[0]), int(landmark[1])
-                        if 0 <= x < frame.shape[1] and 0 <= y < frame.shape[0]:
-                            cv2.circle(display_frame, (x, y), 1, color, -1)
+                    draw_landmarks(frame, face['landmarks_3d'], color)
 
                     # Draw feature text
                     text_y = 30
@@ -407,28 +551,24 @@ def face_mesh_loop():
                     ]
 
                     for line in text_lines:
-                        cv2.putText(display_frame, line, (10, text_y),
+                        cv2.putText(frame, line, (10, text_y),
                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
                         text_y += 25
 
-            # Calculate FPS
+            # Calculate FPS (exponential moving average)
             current_time = time.time()
-            fps = 1 / (current_time - last_time) if (current_time - last_time) > 0 else 0
-            fps_history.append(fps)
-            avg_fps = np.mean(fps_history)
+            dt = current_time - last_time
+            if dt > 0:
+                avg_fps = 0.9 * avg_fps + 0.1 / dt if avg_fps else 1.0 / dt
             last_time = current_time
 
-            cv2.putText(display_frame, f"FPS: {avg_fps:.1f}", (10, frame.shape[0] - 20),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+            put_text_cached(frame, f"FPS: {avg_fps:.1f}", (10, frame.shape[0] - 20), 0.6, (0, 255, 0), 2)
 
             # Encode frame
-            ret, buffer = cv2.imencode('.jpg', display_frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            if not ret:
+            frame_bytes = encode_jpeg(frame)
+            if frame_bytes is None:
                 continue
 
-            frame_bytes = buffer.tobytes()
-            frame_base64 = base64.b64encode(frame_bytes).decode('utf-8')
-
             # Prepare mesh data
             mesh_data = []
             if face_data:
@@ -451,11 +591,11 @@ def face_mesh_loop():
                     z_axis /= np.linalg.norm(z_axis)
                     y_axis = np.cross(z_axis, x_axis)
                     R_mp = np.stack([x_axis, y_axis, z_axis], axis=1)
-                    logger.info(f"R_mp: {R_mp}")
 
                     mesh_data.append({
                         'face_id': face['face_id'],
-                        'landmarks_3d': face['landmarks_3d'],
+                        # FP16 on the wire: sub-pixel precision is meaningless for display
+                        'landmarks_3d': np.asarray(face['landmarks_3d'], dtype=np.float16),
                         'geometry_features': face['geometry_features'],
                         'temporal_features': face['temporal_features'],
                         'valence': face['valence'],
@@ -464,7 +604,7 @@ def face_mesh_loop():
                         'emotion_label': face.get('emotion_label', 'Unknown'),
                         'emotion_emoji': face.get('emotion_emoji', '😐'),
                         'zone_changed': face['zone_changed'],
-                        'color': f"rgb({face['color'][2]}, {face['color'][1]}, {face['color'][0]})",
+                        'color': bgr_to_css(tuple(face['color'])),
                         'flame_mesh': face.get('flame_mesh'),
                         'rotation_matrix': R_mp.tolist(),
                     })
@@ -475,20 +615,17 @@ def face_mesh_loop():
             # Emit frame and mesh data via WebSocket
             try:
                 socketio.emit('face_mesh_frame', {
-                    'frame': frame_base64,
+                    'frame': frame_bytes,
                     'faces': mesh_data,
                     'fps': round(avg_fps, 1),
                     'face_count': len(face_data) if face_data else 0
                 })
             except Exception as e:
-                print(f"Error emitting face mesh data: {e}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Error emitting face mesh data: %r", e)
 
             frame_count += 1
 
-            # Log first frame
-            if frame_count == 1:
-                logger.info(f"✓ First mesh frame emitted successfully")
-
             # Small sleep to prevent CPU overload
             time.sleep(0.01)
 
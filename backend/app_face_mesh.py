@@ -7,7 +7,7 @@ from flask_socketio import emit
 import cv2
 import numpy as np
 import time
-from collections import deque
+from frame_utils import encode_jpeg, put_text_cached, draw_landmarks, bgr_to_css
 
 # Global state for face mesh mode
 is_mesh_streaming = False
@@ -15,22 +15,18 @@ mesh_camera = None
 mesh_camera_lock = None
 
 def draw_face_mesh_on_frame(frame, face_data):
-    """Draw face mesh landmarks and features on frame"""
+    """Draw face mesh landmarks and features on frame (in place)"""
     if not face_data:
         return frame
 
-    display_frame = frame.copy()
+    display_frame = frame
 
     for face in face_data:
-        landmarks_3d = np.array(face['landmarks_3d'])
         features = face['geometry_features']
         color = tuple(face['color'])
 
         # Draw landmarks as points
-        for landmark in landmarks_3d:
-            x, y = int(landmark[0]), int(landmark[1])
-            if 0 <= x < frame.shape[1] and 0 <= y < frame.shape[0]:
-                cv2.circle(display_frame, (x, y), 1, color, -1)
+        draw_landmarks(display_frame, face['landmarks_3d'], color)
 
         # Draw feature text
         text_y = 30
@@ -55,7 +51,7 @@ def generate_face_mesh_frames(camera, camera_lock, socketio):
     global is_mesh_streaming
 
     frame_count = 0
-    fps_history = deque(maxlen=30)
+    avg_fps = 0.0
     last_time = time.time()
 
     while is_mesh_streaming:
@@ -80,16 +76,15 @@ def generate_face_mesh_frames(camera, camera_lock, socketio):
         # Draw overlays
         display_frame = draw_face_mesh_on_frame(frame, face_data)
 
-        # Calculate FPS
+        # Calculate FPS (exponential moving average)
         current_time = time.time()
-        fps = 1 / (current_time - last_time) if (current_time - last_time) > 0 else 0
-        fps_history.append(fps)
-        avg_fps = np.mean(fps_history)
+        dt = current_time - last_time
+        if dt > 0:
+            avg_fps = 0.9 * avg_fps + 0.1 / dt if avg_fps else 1.0 / dt
         last_time = current_time
 
         # Draw FPS
-        cv2.putText(display_frame, f"FPS: {avg_fps:.1f}", (10, frame.shape[0] - 20),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        put_text_cached(display_frame, f"FPS: {avg_fps:.1f}", (10, frame.shape[0] - 20), 0.6, (0, 255, 0), 2)
 
         # Emit data via WebSocket
         if face_data and frame_count % 2 == 0:  # Send every other frame
@@ -98,14 +93,15 @@ def generate_face_mesh_frames(camera, camera_lock, socketio):
             for face in face_data:
                 mesh_data.append({
                     'face_id': face['face_id'],
-                    'landmarks_3d': face['landmarks_3d'],
+                    # FP16 on the wire: sub-pixel precision is meaningless for display
+                    'landmarks_3d': np.asarray(face['landmarks_3d'], dtype=np.float16),
                     'geometry_features': face['geometry_features'],
                     'temporal_features': face['temporal_features'],
                     'valence': face['valence'],
                     'arousal': face['arousal'],
                     'valence_zone': face['valence_zone'],
                     'zone_changed': face['zone_changed'],
-                    'color': f"rgb({face['color'][2]}, {face['color'][1]}, {face['color'][0]})"
+                    'color': bgr_to_css(tuple(face['color']))
                 })
 
             socketio.emit('face_mesh_update', {
@@ -115,11 +111,10 @@ def generate_face_mesh_frames(camera, camera_lock, socketio):
             })
 
         # Encode frame
-        ret, buffer = cv2.imencode('.jpg', display_frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        if not ret:
+        frame_bytes = encode_jpeg(display_frame)
+        if frame_bytes is None:
             continue
 
-        frame_bytes = buffer.tobytes()
         frame_count += 1
 
         yield (b'--frame\r\n'
@@ -9,6 +9,7 @@ import sys
 
 MODEL_URL = "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/latest/face_landmarker.task"
 MODEL_PATH = "face_landmarker.task"
+CHUNK_SIZE = 64 * 1024
 
 def download_model():
     """Download the face landmarker model if it doesn't exist"""
@@ -25,15 +26,25 @@ def download_model():
     print()
     
     try:
-        def progress_hook(count, block_size, total_size):
-            """Show download progress"""
-            percent = int(count * block_size * 100 / total_size)
-            mb_downloaded = count * block_size / (1024 * 1024)
+        # Stream in 64 KB chunks and only redraw progress when the percentage changes
+        with urllib.request.urlopen(MODEL_URL) as response, open(MODEL_PATH, 'wb') as f:
+            total_size = int(response.headers.get('Content-Length', 0))
             mb_total = total_size / (1024 * 1024)
-            sys.stdout.write(f"\rProgress: {percent}% ({mb_downloaded:.2f} / {mb_total:.2f} MB)")
-            sys.stdout.flush()
-        
-        urllib.request.urlretrieve(MODEL_URL, MODEL_PATH, progress_hook)
+            downloaded = 0
+            last_percent = -1
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                downloaded += len(chunk)
+                if total_size:
+                    percent = downloaded * 100 // total_size
+                    if percent != last_percent:
+                        last_percent = percent
+                        mb_downloaded = downloaded / (1024 * 1024)
+                        sys.stdout.write(f"\rProgress: {percent}% ({mb_downloaded:.2f} / {mb_total:.2f} MB)")
+                        sys.stdout.flush()
         print()
         print(f"✓ Model downloaded successfully!")
         
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Export the FER emotion classifier to ONNX for onnx_emotion_detector.py
+Requires: pip install fer tf2onnx
+"""
+
+import os
+import sys
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fer_mini_xception.onnx')
+
+def export_model():
+    """Convert FER's bundled Keras model to ONNX if it doesn't exist"""
+
+    if os.path.exists(MODEL_PATH):
+        print(f"✓ Model already exists: {MODEL_PATH}")
+        return True
+
+    try:
+        import fer
+        import tensorflow as tf
+        import tf2onnx
+        from tensorflow.keras.models import load_model
+    except ImportError as e:
+        print(f"❌ Missing dependency: {e}")
+        print("   Run: pip install fer tf2onnx")
+        return False
+
+    keras_path = os.path.join(os.path.dirname(fer.__file__), 'data', 'emotion_model.hdf5')
+    print(f"Exporting FER emotion model...")
+    print(f"Source: {keras_path}")
+    print(f"Destination: {MODEL_PATH}")
+
+    # Written to a per-process temp file and moved into place atomically, so a
+    # concurrent reader never sees a partial model and a failed export never
+    # deletes a file another process finished
+    tmp_path = f"{MODEL_PATH[:-len('.onnx')]}.{os.getpid()}.tmp.onnx"
+    try:
+        model = load_model(keras_path, compile=False)
+        input_signature = [tf.TensorSpec((None,) + model.input_shape[1:], tf.float32, name='input')]
+        tf2onnx.convert.from_keras(model, input_signature=input_signature, output_path=tmp_path)
+        os.replace(tmp_path, MODEL_PATH)
+        print(f"✓ Model exported successfully! Input shape: {model.input_shape}")
+        return True
+    except Exception as e:
+        print(f"\n❌ Error exporting model: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+if __name__ == "__main__":
+    success = export_model()
+    sys.exit(0 if success else 1)
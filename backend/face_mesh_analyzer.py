@@ -7,11 +7,11 @@ Integrates FLAME parametric 3D face model for dense mesh reconstruction
 import numpy as np
 import cv2
 import mediapipe as mp
-from collections import deque, defaultdict
-from scipy.spatial import distance
+from collections import defaultdict
 import time
 import os
 import logging
+from _geom_kernel import FEATURE_NAMES, compute_features, compute_features_batch
 logger = logging.getLogger(__name__)
 
 # Try to import FLAME model (optional - falls back to landmark-only if not available)
@@ -54,62 +54,46 @@ VisionRunningMode = mp.tasks.vision.RunningMode
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(SCRIPT_DIR, 'face_landmarker.task')
 
-# Initialize face landmarker options
-face_landmarker_options = FaceLandmarkerOptions(
-    base_options=BaseOptions(model_asset_path=MODEL_PATH),
-    running_mode=VisionRunningMode.IMAGE,
-    num_faces=2,
-    min_face_detection_confidence=0.5,
-    min_face_presence_confidence=0.5,
-    min_tracking_confidence=0.5,
-    output_face_blendshapes=True,
-    output_facial_transformation_matrixes=True
+def make_face_landmarker_options(delegate=BaseOptions.Delegate.CPU):
+    """Face landmarker options for the given delegate (VIDEO mode - tracks between frames)"""
+    return FaceLandmarkerOptions(
+        base_options=BaseOptions(model_asset_path=MODEL_PATH, delegate=delegate),
+        running_mode=VisionRunningMode.VIDEO,
+        num_faces=2,
+        min_face_detection_confidence=0.5,
+        min_face_presence_confidence=0.5,
+        min_tracking_confidence=0.5,
+        output_face_blendshapes=True,
+        output_facial_transformation_matrixes=True
+    )
+
+# Landmark indices used by the geometry features are defined in _geom_kernel
+
+# Frames wider than this are downscaled before FaceLandmarker.detect
+MAX_DETECT_WIDTH = 640
+
+# Features summarized over the temporal window (first columns of the history rows)
+TEMPORAL_FEATURES = FEATURE_NAMES[:4]
+
+# Emotion quadrant (4-quadrant valence/arousal model), indexed by
+# 2 * (arousal > AROUSAL_THRESHOLD) + (valence > VALENCE_THRESHOLD)
+AROUSAL_THRESHOLD = 0.5
+VALENCE_THRESHOLD = 0.0
+EMOTION_LUT = (
+    ("Sad", "😢"),      # Low arousal + negative valence
+    ("Calm", "😌"),     # Low arousal + positive valence
+    ("Tense", "😠"),    # High arousal + negative valence
+    ("Excited", "😄"),  # High arousal + positive valence
 )
 
-# Key landmark indices for MediaPipe Face Mesh (468 points)
-# Reference: https://github.com/google/mediapipe/blob/master/mediapipe/python/solutions/face_mesh.py
-
-LANDMARKS = {
-    # Eyes
-    'left_eye_top': 159,
-    'left_eye_bottom': 145,
-    'left_eye_left': 33,
-    'left_eye_right': 133,
-    'right_eye_top': 386,
-    'right_eye_bottom': 374,
-    'right_eye_left': 362,
-    'right_eye_right': 263,
-
-    # Eyebrows
-    'left_eyebrow_inner': 70,
-    'left_eyebrow_outer': 46,
-    'left_eyebrow_top': 105,
-    'right_eyebrow_inner': 300,
-    'right_eyebrow_outer': 276,
-    'right_eyebrow_top': 334,
-
-    # Mouth
-    'mouth_left': 61,
-    'mouth_right': 291,
-    'mouth_top': 13,
-    'mouth_bottom': 14,
-    'upper_lip_top': 0,
-    'lower_lip_bottom': 17,
-
-    # Mouth corners (smile)
-    'mouth_corner_left': 61,
-    'mouth_corner_right': 291,
-
-    # Face outline
-    'face_left': 234,
-    'face_right': 454,
-    'face_top': 10,
-    'face_bottom': 152,
-
-    # Nose
-    'nose_tip': 1,
-    'nose_bridge': 168,
-}
+# Traffic light color per valence zone, indexed by
+# 1 + (valence > ZONE_THRESHOLD) - (valence < -ZONE_THRESHOLD)
+ZONE_THRESHOLD = 0.2
+ZONE_LUT = (
+    ((0, 0, 255), 'negative'),    # Red
+    ((0, 255, 255), 'neutral'),   # Yellow
+    ((0, 255, 0), 'positive'),    # Green
+)
 
 # Temporal feature window (seconds)
 TEMPORAL_WINDOW = 3.0  # 3 second window
@@ -126,16 +110,36 @@ class FaceMeshAnalyzer:
         Args:
             use_flame: If True, use FLAME parametric model for dense mesh reconstruction
         """
-        # Initialize MediaPipe Face Landmarker
+        # Initialize MediaPipe Face Landmarker - GPU delegate first, CPU if GL/Metal is unavailable
         try:
-            self.face_landmarker = FaceLandmarker.create_from_options(face_landmarker_options)
+            self.face_landmarker = FaceLandmarker.create_from_options(
+                make_face_landmarker_options(BaseOptions.Delegate.GPU))
+            print("✓ Face Landmarker running on GPU delegate")
         except Exception as e:
-            raise RuntimeError(f"Failed to initialize Face Landmarker: {e}")
+            print(f"⚠️  GPU delegate not available (using CPU): {e}")
+            try:
+                self.face_landmarker = FaceLandmarker.create_from_options(make_face_landmarker_options())
+            except Exception as e:
+                raise RuntimeError(f"Failed to initialize Face Landmarker: {e}")
+
+        # VIDEO mode needs strictly increasing timestamps
+        self._last_timestamp_ms = -1
 
-        self.feature_history = defaultdict(lambda: deque(maxlen=MAX_HISTORY_POINTS))
-        self.timestamps = defaultdict(lambda: deque(maxlen=MAX_HISTORY_POINTS))
+        # Per-face feature history: FP16 ring buffers of feature rows + FP64 monotonic timestamps
+        self.feature_history = defaultdict(
+            lambda: np.zeros((MAX_HISTORY_POINTS, len(FEATURE_NAMES)), dtype=np.float16))
+        self.timestamps = defaultdict(lambda: np.zeros(MAX_HISTORY_POINTS, dtype=np.float64))
+        self.history_head = defaultdict(int)  # Next write position
+        self.history_len = defaultdict(int)
         self.previous_valence_zone = {}
 
+        # Scratch buffers for detection input, reallocated only when the frame size changes
+        self._small_buf = None
+        self._rgb_buf = None
+
+        # Compile the geometry kernel now so the first face doesn't pay the JIT cost
+        compute_features_batch(np.zeros((1, 478, 3), dtype=np.float32))
+
         # Initialize FLAME model if requested and available
         self.use_flame = use_flame and FLAME_AVAILABLE
         self.flame_model = None
@@ -197,29 +201,35 @@ class FaceMeshAnalyzer:
         t = mu_dst - s * (R @ mu_src)
         return s, R, t
 
-    def process_face_frame(self, face_landmarks, frame, face_idx):
+    def process_face_frame(self, face_landmarks, frame, face_idx, precomputed=None):
         """
         Full preprocessing pipeline (steps 1-6). Returns dict with:
         landmarks_3d, features, temporal_features, valence, arousal,
         emotion_label, color, zone, zone_changed,
         s, R, t, expr_landmarks_canonical, pose_landmarks_xy
+
+        precomputed: optional (landmarks_3d, features, valence, arousal) from
+        the batched pass in process_frame - steps 1-3 are skipped when given
         """
-        # 1) Extract landmarks
-        landmarks_3d = self._extract_landmarks_3d_new(face_landmarks, frame.shape)  # (N,3)
-        logger.info(f"Landmarks 3D: {landmarks_3d.shape}")
-
-        # 2) Compute geometry features + temporal bookkeeping
-        features = self._compute_geometry_features(landmarks_3d, face_idx)
-        for feature_name, value in features.items():
-            self.feature_history[f"face_{face_idx}_{feature_name}"].append(value)
-            self.timestamps[f"face_{face_idx}_{feature_name}"].append(time.time())
-        temporal_features = self._compute_temporal_features(face_idx)
-
-        # 3) Valence / arousal / UI outputs
-        valence, arousal = self._compute_valence_arousal(features)
-        emotion_label, emotion_emoji = self._valence_arousal_to_emotion(valence, arousal)
-        color, zone = self._valence_to_color(valence)
-        zone_changed = self._check_zone_change(face_idx, zone)
+        if precomputed is not None:
+            landmarks_3d, features, valence, arousal = precomputed
+            self._append_history(face_idx, features, time.monotonic())
+            temporal_features = self._compute_temporal_features(face_idx)
+        else:
+            # 1) Extract landmarks
+            landmarks_3d = self._extract_landmarks_3d_new(face_landmarks, frame.shape)  # (N,3)
+            logger.info(f"Landmarks 3D: {landmarks_3d.shape}")
+
+            # 2) Compute geometry features + temporal bookkeeping
+            features = self._compute_geometry_features(landmarks_3d, face_idx)
+            self._append_history(face_idx, features, time.monotonic())
+            temporal_features = self._compute_temporal_features(face_idx)
+
+            # 3) Valence / arousal
+            valence, arousal = self._compute_valence_arousal(features)
+
+        # UI outputs
+        emotion_label, emotion_emoji, color, zone, zone_changed = self._classify(face_idx, valence, arousal)
 
         # --- FLAME alignment pipeline ---
         # Use the FLAME fitter reference indices (must exist)
@@ -291,16 +301,36 @@ class FaceMeshAnalyzer:
         }
 
 
-    def process_frame(self, frame):
-        """Process a single frame and extract face mesh data"""
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def process_frame(self, frame, serialize=False):
+        """Process a single frame and extract face mesh data
+
+        Landmarks are returned as a float32 array; pass serialize=True to get
+        nested lists for plain-JSON consumers
+        """
+        # Downscale for detection - landmarks come back normalized, so they are
+        # still mapped onto the full-resolution frame below
+        height, width = frame.shape[:2]
+        if width > MAX_DETECT_WIDTH:
+            detect_shape = (int(height * MAX_DETECT_WIDTH / width), MAX_DETECT_WIDTH) + frame.shape[2:]
+            if self._small_buf is None or self._small_buf.shape != detect_shape:
+                self._small_buf = np.empty(detect_shape, dtype=np.uint8)
+            detect_frame = cv2.resize(frame, (detect_shape[1], detect_shape[0]),
+                                      dst=self._small_buf, interpolation=cv2.INTER_AREA)
+        else:
+            detect_frame = frame
+
+        # Convert BGR to RGB into a buffer reused across frames
+        if self._rgb_buf is None or self._rgb_buf.shape != detect_frame.shape:
+            self._rgb_buf = np.empty_like(detect_frame)
+        rgb_frame = cv2.cvtColor(detect_frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
 
         # Create MediaPipe Image
         mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
 
         # Process with MediaPipe Face Landmarker
-        results = self.face_landmarker.detect(mp_image)
+        timestamp_ms = max(int(time.monotonic() * 1000), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        results = self.face_landmarker.detect_for_video(mp_image, timestamp_ms)
 
         if not results.face_landmarks:
             return None
@@ -308,22 +338,27 @@ class FaceMeshAnalyzer:
         faces_data = []
         # current_time = time.time()
 
+        # Geometry features and valence/arousal for all faces at once: (F,N,3) -> (F,8) -> (F,)
+        landmarks_batch = np.stack([self._extract_landmarks_3d_new(face_landmarks, frame.shape)
+                                    for face_landmarks in results.face_landmarks])
+        feature_matrix = compute_features_batch(landmarks_batch)
+        valences, arousals = self._compute_valence_arousal_batch(feature_matrix)
+
         for face_idx, face_landmarks in enumerate(results.face_landmarks):
             flame_mesh_data = None
+            landmarks_3d = landmarks_batch[face_idx]
+            features = dict(zip(FEATURE_NAMES, feature_matrix[face_idx].tolist()))
+            valence, arousal = float(valences[face_idx]), float(arousals[face_idx])
 
             # ----- Step 1: preprocess (process_face_frame does steps 1-6) -----
             try:
-                out = self.process_face_frame(face_landmarks, frame, face_idx)
+                out = self.process_face_frame(face_landmarks, frame, face_idx,
+                                              precomputed=(landmarks_3d, features, valence, arousal))
             except Exception as e:
                 logger.exception("process_face_frame failed: %s", e)
                 # fallback: minimal processing so we still return useful data
-                landmarks_3d = self._extract_landmarks_3d_new(face_landmarks, frame.shape)
-                features = self._compute_geometry_features(landmarks_3d, face_idx)
                 temporal_features = self._compute_temporal_features(face_idx)
-                valence, arousal = self._compute_valence_arousal(features)
-                emotion_label, emotion_emoji = self._valence_arousal_to_emotion(valence, arousal)
-                color, zone = self._valence_to_color(valence)
-                zone_changed = self._check_zone_change(face_idx, zone)
+                emotion_label, emotion_emoji, color, zone, zone_changed = self._classify(face_idx, valence, arousal)
 
                 out = {
                     "landmarks_3d": landmarks_3d,
@@ -357,15 +392,16 @@ class FaceMeshAnalyzer:
                     flame_mesh_data = None
 
          # ----- Step 3: assemble face data -----
+            landmarks_3d = np.asarray(out["landmarks_3d"], dtype=np.float32)
             face_data = {
                 "face_id": int(face_idx),
 
-                # Landmarks
-                "landmarks_3d": np.asarray(out["landmarks_3d"]).tolist(),
+                # Landmarks (float32 array - serialized natively by socket_json)
+                "landmarks_3d": landmarks_3d.tolist() if serialize else landmarks_3d,
 
-                # Features (may be numpy)
-                "geometry_features": np.asarray(out["features"]).tolist() if out.get("features") is not None else None,
-                "temporal_features": np.asarray(out["temporal_features"]).tolist() if out.get("temporal_features") is not None else None,
+                # Features (dicts of Python floats)
+                "geometry_features": out.get("features"),
+                "temporal_features": out.get("temporal_features"),
 
                 # Emotion values (force native Python types)
                 "valence": float(out["valence"]),
@@ -396,31 +432,13 @@ class FaceMeshAnalyzer:
         return faces_data
 
 
-    def _extract_landmarks_3d(self, face_landmarks, frame_shape):
-        """Extract 3D coordinates of all landmarks (old API - kept for compatibility)"""
-        height, width = frame_shape[:2]
-        landmarks = []
-
-        for landmark in face_landmarks.landmark:
-            x = landmark.x * width
-            y = landmark.y * height
-            z = landmark.z * width  # Normalized depth
-            landmarks.append([x, y, z])
-
-        return np.array(landmarks)
-
     def _extract_landmarks_3d_new(self, face_landmarks, frame_shape):
         """Extract 3D coordinates of all landmarks (new API)"""
         height, width = frame_shape[:2]
-        landmarks = []
-
-        for landmark in face_landmarks:
-            x = landmark.x * width
-            y = landmark.y * height
-            z = landmark.z * width  # Normalized depth
-            landmarks.append([x, y, z])
-
-        return np.array(landmarks)
+        landmarks = np.array([(lm.x, lm.y, lm.z) for lm in face_landmarks], dtype=np.float32)
+        # Normalized -> pixels in one multiply (z uses width, like x)
+        landmarks *= np.array([width, height, width], dtype=np.float32)
+        return landmarks
 
     def _generate_flame_mesh(self, landmarks_3d):
         """
@@ -466,155 +484,54 @@ class FaceMeshAnalyzer:
 
         return flame_mesh_data
 
-    def _get_landmark(self, landmarks, key):
-        """Get specific landmark by key"""
-        idx = LANDMARKS[key]
-        return landmarks[idx]
-
-    def _compute_distance(self, p1, p2):
-        """Compute Euclidean distance between two points"""
-        return distance.euclidean(p1[:2], p2[:2])  # Use only x, y
-
     def _compute_geometry_features(self, landmarks, face_idx):
         """Compute Phase 1 geometry features"""
+        values = compute_features(landmarks)
+        return dict(zip(FEATURE_NAMES, values.tolist()))
 
-        # Get face size for normalization
-        face_left = self._get_landmark(landmarks, 'face_left')
-        face_right = self._get_landmark(landmarks, 'face_right')
-        face_width = self._compute_distance(face_left, face_right)
-
-        # Avoid division by zero
-        if face_width < 1:
-            face_width = 1
-
-        # MOUTH OPENNESS
-        mouth_top = self._get_landmark(landmarks, 'mouth_top')
-        mouth_bottom = self._get_landmark(landmarks, 'mouth_bottom')
-        mouth_height = self._compute_distance(mouth_top, mouth_bottom)
-        mouth_openness = mouth_height / face_width
-
-        # SMILE AMPLITUDE
-        mouth_left = self._get_landmark(landmarks, 'mouth_corner_left')
-        mouth_right = self._get_landmark(landmarks, 'mouth_corner_right')
-        mouth_width = self._compute_distance(mouth_left, mouth_right)
-
-        # Smile is measured by mouth width relative to face width
-        # and upward movement of corners
-        smile_width_ratio = mouth_width / face_width
-
-        # Calculate vertical position of mouth corners relative to mouth center
-        mouth_center_y = (mouth_top[1] + mouth_bottom[1]) / 2
-        corner_lift = mouth_center_y - ((mouth_left[1] + mouth_right[1]) / 2)
-        corner_lift_normalized = corner_lift / face_width
-
-        smile_amplitude = smile_width_ratio + corner_lift_normalized
-
-        # EYE OPENNESS (both eyes)
-        left_eye_top = self._get_landmark(landmarks, 'left_eye_top')
-        left_eye_bottom = self._get_landmark(landmarks, 'left_eye_bottom')
-        left_eye_height = self._compute_distance(left_eye_top, left_eye_bottom)
-
-        right_eye_top = self._get_landmark(landmarks, 'right_eye_top')
-        right_eye_bottom = self._get_landmark(landmarks, 'right_eye_bottom')
-        right_eye_height = self._compute_distance(right_eye_top, right_eye_bottom)
-
-        avg_eye_openness = (left_eye_height + right_eye_height) / (2 * face_width)
-
-        # EYEBROW RAISE
-        left_eyebrow = self._get_landmark(landmarks, 'left_eyebrow_top')
-        left_eye_top_pt = self._get_landmark(landmarks, 'left_eye_top')
-        left_eyebrow_raise = (left_eye_top_pt[1] - left_eyebrow[1]) / face_width
-
-        right_eyebrow = self._get_landmark(landmarks, 'right_eyebrow_top')
-        right_eye_top_pt = self._get_landmark(landmarks, 'right_eye_top')
-        right_eyebrow_raise = (right_eye_top_pt[1] - right_eyebrow[1]) / face_width
-
-        avg_eyebrow_raise = (left_eyebrow_raise + right_eyebrow_raise) / 2
-
-        # HEAD TILT (using nose and face points)
-        nose_tip = self._get_landmark(landmarks, 'nose_tip')
-        nose_bridge = self._get_landmark(landmarks, 'nose_bridge')
-
-        # Pitch (up/down rotation)
-        pitch = np.arctan2(nose_tip[1] - nose_bridge[1], nose_tip[2] - nose_bridge[2])
-
-        # Yaw (left/right rotation)
-        yaw = np.arctan2(nose_tip[0] - nose_bridge[0], nose_tip[2] - nose_bridge[2])
-
-        # Roll (tilt)
-        roll = np.arctan2(face_right[1] - face_left[1], face_right[0] - face_left[0])
-
-        # Z-MOTION (depth variance)
-        # Use average Z coordinate of face outline points
-        face_outline_z = np.mean([
-            face_left[2], face_right[2],
-            self._get_landmark(landmarks, 'face_top')[2],
-            self._get_landmark(landmarks, 'face_bottom')[2]
-        ])
-
-        return {
-            'mouth_openness': float(mouth_openness),
-            'smile_amplitude': float(smile_amplitude),
-            'eye_openness': float(avg_eye_openness),
-            'eyebrow_raise': float(avg_eyebrow_raise),
-            'head_pitch': float(pitch),
-            'head_yaw': float(yaw),
-            'head_roll': float(roll),
-            'face_depth': float(face_outline_z),
-        }
+    def _append_history(self, face_idx, features, timestamp):
+        """Write one feature row into the face's history ring buffer"""
+        head = self.history_head[face_idx]
+        self.feature_history[face_idx][head] = list(features.values())
+        self.timestamps[face_idx][head] = timestamp
+        self.history_head[face_idx] = (head + 1) % MAX_HISTORY_POINTS
+        self.history_len[face_idx] = min(self.history_len[face_idx] + 1, MAX_HISTORY_POINTS)
 
     def _compute_temporal_features(self, face_idx):
         """Compute temporal features from history window"""
-        temporal = {}
-
-        for feature_name in ['mouth_openness', 'smile_amplitude', 'eye_openness', 'eyebrow_raise']:
-            key = f"face_{face_idx}_{feature_name}"
-            history = list(self.feature_history[key])
-            timestamps = list(self.timestamps[key])
-
-            if len(history) < 2:
-                temporal[feature_name] = {
-                    'mean': 0.0,
-                    'std': 0.0,
-                    'velocity': 0.0,
-                }
-                continue
-
-            # Filter to temporal window
-            current_time = time.time()
-            windowed_values = []
-            windowed_times = []
-
-            for val, ts in zip(history, timestamps):
-                if current_time - ts <= TEMPORAL_WINDOW:
-                    windowed_values.append(val)
-                    windowed_times.append(ts)
-
-            if len(windowed_values) < 2:
-                temporal[feature_name] = {
-                    'mean': windowed_values[0] if windowed_values else 0.0,
-                    'std': 0.0,
-                    'velocity': 0.0,
-                }
-                continue
-
-            values_array = np.array(windowed_values)
-            times_array = np.array(windowed_times)
+        count = self.history_len[face_idx]
+        if count < 2:
+            return {name: {'mean': 0.0, 'std': 0.0, 'velocity': 0.0} for name in TEMPORAL_FEATURES}
+
+        # Ring buffer -> chronological order (oldest first)
+        values = self.feature_history[face_idx][:, :len(TEMPORAL_FEATURES)]
+        timestamps = self.timestamps[face_idx]
+        if count < MAX_HISTORY_POINTS:
+            values, timestamps = values[:count], timestamps[:count]
+        else:
+            head = self.history_head[face_idx]
+            values = np.roll(values, -head, axis=0)
+            timestamps = np.roll(timestamps, -head)
 
-            # Mean and std
-            mean_val = float(np.mean(values_array))
-            std_val = float(np.std(values_array))
+        # Filter to temporal window - timestamps are ascending, so binary search for the start
+        start = np.searchsorted(timestamps, time.monotonic() - TEMPORAL_WINDOW)
+        values = values[start:]
+        timestamps = timestamps[start:]
 
-            # Velocity (derivative)
-            velocity = float((values_array[-1] - values_array[0]) / (times_array[-1] - times_array[0]))
+        if len(values) < 2:
+            means = values[0].tolist() if len(values) else [0.0] * len(TEMPORAL_FEATURES)
+            return {name: {'mean': mean, 'std': 0.0, 'velocity': 0.0}
+                    for name, mean in zip(TEMPORAL_FEATURES, means)}
 
-            temporal[feature_name] = {
-                'mean': mean_val,
-                'std': std_val,
-                'velocity': velocity,
-            }
+        # Mean, std and velocity (derivative) for all features at once
+        means = values.mean(axis=0).tolist()
+        stds = values.std(axis=0).tolist()
+        velocities = ((values[-1] - values[0]) / (timestamps[-1] - timestamps[0])).tolist()
 
-        return temporal
+        return {
+            name: {'mean': mean, 'std': std, 'velocity': velocity}
+            for name, mean, std, velocity in zip(TEMPORAL_FEATURES, means, stds, velocities)
+        }
 
     def _compute_valence_arousal(self, features):
         """
@@ -623,12 +540,20 @@ class FaceMeshAnalyzer:
         Valence: pleasure/displeasure (-1 to 1)
         Arousal: activation/deactivation (0 to 1)
         """
+        row = np.array([[features[name] for name in FEATURE_NAMES]])
+        valence, arousal = self._compute_valence_arousal_batch(row)
+        return valence[0], arousal[0]
+
+    def _compute_valence_arousal_batch(self, feature_matrix):
+        """Valence and arousal for every row of an (F, 8) feature matrix, as (F,) arrays"""
+        mouth, smile, eye, brow = feature_matrix[:, :4].T  # FEATURE_NAMES order
+
         # VALENCE (positive/negative emotion)
         # Positive indicators: smile, eyebrow raise
         # Negative indicators: frown (negative smile), eyebrow furrow
 
-        smile_contrib = features['smile_amplitude'] * 2.0  # Weight smile heavily
-        eyebrow_contrib = features['eyebrow_raise'] * 0.5
+        smile_contrib = smile * 2.0  # Weight smile heavily
+        eyebrow_contrib = brow * 0.5
 
         valence = smile_contrib + eyebrow_contrib - 0.5  # Center around 0
         valence = np.clip(valence, -1, 1)
@@ -637,54 +562,30 @@ class FaceMeshAnalyzer:
         # High arousal: wide eyes, open mouth, fast movements
         # Low arousal: relaxed features
 
-        eye_contrib = features['eye_openness'] * 2.0
-        mouth_contrib = features['mouth_openness'] * 1.5
+        eye_contrib = eye * 2.0
+        mouth_contrib = mouth * 1.5
 
         arousal = eye_contrib + mouth_contrib
         arousal = np.clip(arousal, 0, 1)
 
         return valence, arousal
 
-    def _valence_arousal_to_emotion(self, valence, arousal):
+    def _classify(self, face_idx, valence, arousal):
         """
-        Map valence and arousal to emotion label (4-quadrant model)
+        Emotion label, traffic light color and zone change for one face
 
-        High Arousal + Negative Valence = Angry/Tense
-        High Arousal + Positive Valence = Excited/Happy
-        Low Arousal + Negative Valence = Sad/Depressed
-        Low Arousal + Positive Valence = Calm/Relaxed
+        Returns (emotion_label, emotion_emoji, color, zone, zone_changed) from
+        two table lookups instead of if/else chains
         """
-        arousal_threshold = 0.5
-        valence_threshold = 0.0
-
-        if arousal > arousal_threshold:
-            # High arousal
-            if valence > valence_threshold:
-                return "Excited", "😄"
-            else:
-                return "Tense", "😠"
-        else:
-            # Low arousal
-            if valence > valence_threshold:
-                return "Calm", "😌"
-            else:
-                return "Sad", "😢"
-
-    def _valence_to_color(self, valence):
-        """Map valence to traffic light color"""
-        if valence > 0.2:
-            return (0, 255, 0), 'positive'  # Green
-        elif valence < -0.2:
-            return (0, 0, 255), 'negative'  # Red
-        else:
-            return (0, 255, 255), 'neutral'  # Yellow
+        emotion_label, emotion_emoji = EMOTION_LUT[2 * (arousal > AROUSAL_THRESHOLD) + (valence > VALENCE_THRESHOLD)]
+        color, zone = ZONE_LUT[1 + (valence > ZONE_THRESHOLD) - (valence < -ZONE_THRESHOLD)]
 
-    def _check_zone_change(self, face_idx, new_zone):
-        """Check if valence zone has changed"""
+        # Zone change against the previous frame of this face
         old_zone = self.previous_valence_zone.get(face_idx)
-        changed = old_zone is not None and old_zone != new_zone
-        self.previous_valence_zone[face_idx] = new_zone
-        return changed
+        self.previous_valence_zone[face_idx] = zone
+        zone_changed = old_zone is not None and old_zone != zone
+
+        return emotion_label, emotion_emoji, color, zone, zone_changed
 
     def get_landmark_indices_for_visualization(self):
         """Return landmark indices for 3D visualization"""
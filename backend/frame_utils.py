@@ -0,0 +1,97 @@
+"""
+Frame utilities shared by the streaming loops
+JPEG encoding uses libjpeg-turbo through PyTurboJPEG when installed, OpenCV otherwise
+Overlay text is rasterized once per string and pasted from a small cache
+"""
+
+import cv2
+import numpy as np
+from functools import lru_cache
+
+JPEG_QUALITY = 85
+# Baseline, single-pass Huffman encoding - no optimize/progressive second pass
+JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY,
+               cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+               cv2.IMWRITE_JPEG_PROGRESSIVE, 0]
+
+TEXT_FONT = cv2.FONT_HERSHEY_SIMPLEX
+TEXT_CACHE_SIZE = 512  # Cache is dropped when full (FPS strings keep churning)
+
+# Try to load TurboJPEG (optional - SIMD encoder, falls back to cv2.imencode)
+TURBOJPEG_AVAILABLE = False
+_jpeg = None
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+    _jpeg = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+    print("✓ TurboJPEG encoder available")
+except (ImportError, OSError, RuntimeError) as e:
+    print(f"⚠️  TurboJPEG not available (using OpenCV encoder): {e}")
+
+def encode_jpeg(frame, quality=JPEG_QUALITY):
+    """Encode a BGR frame to JPEG bytes, returns None on failure"""
+    if TURBOJPEG_AVAILABLE:
+        return _jpeg.encode(frame, quality=quality, pixel_format=TJPF_BGR,
+                            jpeg_subsample=TJSAMP_420)
+
+    params = JPEG_PARAMS if quality == JPEG_QUALITY else [cv2.IMWRITE_JPEG_QUALITY, quality] + JPEG_PARAMS[2:]
+    ret, buffer = cv2.imencode('.jpg', frame, params)
+    if not ret:
+        return None
+    return buffer.tobytes()
+
+@lru_cache(maxsize=256)
+def bgr_to_css(color):
+    """Format a BGR tuple as a CSS rgb() string (cached - colors repeat every frame)"""
+    return f"rgb({color[2]}, {color[1]}, {color[0]})"
+
+# Pixel pattern of cv2.circle(..., radius=1, thickness=-1): center plus 4-neighbours
+_DOT_OFFSETS = np.array([[0, 0], [-1, 0], [1, 0], [0, -1], [0, 1]], dtype=np.int32)
+
+def draw_landmarks(frame, landmarks, color):
+    """Draw landmark dots in one vectorized write instead of a cv2.circle per point
+    Landmarks whose center is off-frame are skipped entirely (as the old per-point
+    loop did), unlike a bare cv2.circle that would still paint their in-frame edge"""
+    pts = np.asarray(landmarks, dtype=np.float32)[:, :2].astype(np.int32)
+    h, w = frame.shape[:2]
+    inside = (pts[:, 0] >= 0) & (pts[:, 0] < w) & (pts[:, 1] >= 0) & (pts[:, 1] < h)
+    dots = (pts[inside, None, :] + _DOT_OFFSETS).reshape(-1, 2)
+    dots = dots[(dots[:, 0] >= 0) & (dots[:, 0] < w) & (dots[:, 1] >= 0) & (dots[:, 1] < h)]
+    frame[dots[:, 1], dots[:, 0]] = color
+
+# Rendered text sprites keyed by (text, scale, color, thickness)
+_text_cache = {}
+
+def _render_text(text, scale, color, thickness):
+    """Rasterize text once, returns (sprite, mask, ascent, pad)"""
+    (w, h), baseline = cv2.getTextSize(text, TEXT_FONT, scale, thickness)
+    pad = thickness
+    canvas = np.zeros((h + baseline + 2 * pad, w + 2 * pad), dtype=np.uint8)
+    cv2.putText(canvas, text, (pad, h + pad), TEXT_FONT, scale, 255, thickness)
+    _, mask = cv2.threshold(canvas, 127, 1, cv2.THRESH_BINARY)
+    sprite = np.empty(canvas.shape + (3,), dtype=np.uint8)
+    sprite[:] = color
+    return sprite, mask, h, pad
+
+def put_text_cached(frame, text, org, scale, color, thickness):
+    """Drop-in for cv2.putText(FONT_HERSHEY_SIMPLEX) that pastes a cached sprite"""
+    key = (text, scale, color, thickness)
+    entry = _text_cache.get(key)
+    if entry is None:
+        if len(_text_cache) >= TEXT_CACHE_SIZE:
+            _text_cache.clear()
+        entry = _text_cache[key] = _render_text(text, scale, color, thickness)
+    sprite, mask, ascent, pad = entry
+
+    # Same anchor as putText: org is the bottom-left of the text baseline
+    x0 = org[0] - pad
+    y0 = org[1] - ascent - pad
+    mh, mw = mask.shape
+    fx0, fy0 = max(x0, 0), max(y0, 0)
+    fx1, fy1 = min(x0 + mw, frame.shape[1]), min(y0 + mh, frame.shape[0])
+    if fx0 >= fx1 or fy0 >= fy1:
+        return
+
+    sx0, sy0 = fx0 - x0, fy0 - y0
+    sx1, sy1 = fx1 - x0, fy1 - y0
+    cv2.copyTo(sprite[sy0:sy1, sx0:sx1], mask[sy0:sy1, sx0:sx1], frame[fy0:fy1, fx0:fx1])
@@ -0,0 +1,139 @@
+"""
+ONNX Runtime Emotion Detector
+Drop-in replacement for FER.detect_emotions() that runs the FER mini-XCEPTION
+classifier through ONNX Runtime instead of Keras/TensorFlow.
+Export the model once with: python export_fer_onnx.py
+(optionally quantize it to int8 with: python quantize_fer_onnx.py, used with int8=True)
+"""
+
+import os
+import numpy as np
+import cv2
+import onnxruntime as ort
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(SCRIPT_DIR, 'fer_mini_xception.onnx')
+INT8_MODEL_PATH = os.path.join(SCRIPT_DIR, 'fer_mini_xception_int8.onnx')
+
+# Same label order as FER._get_labels()
+EMOTION_LABELS = ('angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral')
+
+MAX_FACES = 16
+FACE_OFFSETS = (10, 10)  # Padding around detected faces, matches FER defaults
+
+# Preferred execution providers, fastest first
+PREFERRED_PROVIDERS = ['OpenVINOExecutionProvider', 'CPUExecutionProvider']
+
+
+class ONNXEmotionDetector:
+    """Face detection + batched emotion classification with the FER result format"""
+
+    # detect_emotions() takes single-channel frames as-is (skips cvtColor)
+    accepts_grayscale = True
+
+    def __init__(self, model_path=None, max_faces=MAX_FACES, threads=None, int8=False):
+        if model_path is None:
+            # FP32 unless the caller opts in to the quantized model
+            model_path = INT8_MODEL_PATH if int8 else MODEL_PATH
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Emotion model not found: {model_path}")
+
+        available = ort.get_available_providers()
+        providers = [p for p in PREFERRED_PROVIDERS if p in available]
+        options = ort.SessionOptions()
+        if threads:
+            # Intra-op pool size (default: all cores)
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=providers)
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Keras export is NHWC: (batch, height, width, 1)
+        _, height, width, _ = model_input.shape
+        self.target_size = (int(width), int(height))
+
+        # Haar cascade loaded once - same detector FER uses with mtcnn=False
+        self.face_detector = cv2.CascadeClassifier(
+            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        )
+
+        # Preallocated input batch, filled in place for every call
+        self.max_faces = max_faces
+        self._batch = np.empty((max_faces, int(height), int(width), 1), dtype=np.float32)
+
+        # Optional replacement for the Haar cascade with a find_faces(img) method
+        # (e.g. onnx_face_detector.ORTFaceDetector) - gets the frame as passed in
+        self.face_model = None
+
+    def find_faces(self, gray):
+        """Detect faces on a grayscale image, returns (x, y, w, h) rectangles"""
+        faces = self.face_detector.detectMultiScale(
+            gray, scaleFactor=1.1, minNeighbors=5, minSize=(50, 50)
+        )
+        return faces[:self.max_faces]
+
+    def _add_faces(self, frame, boxes):
+        """Crop and resize the faces of one frame into the input batch after boxes"""
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        img_h, img_w = gray.shape[:2]
+        off_x, off_y = FACE_OFFSETS
+
+        if self.face_model is None:
+            faces = self.find_faces(gray)
+        else:
+            faces = self.face_model.find_faces(frame)[:self.max_faces]
+        if len(boxes) + len(faces) > len(self._batch):
+            # Batched calls can hold more faces than max_faces - grow the buffer
+            grown = np.empty((2 * (len(boxes) + len(faces)),) + self._batch.shape[1:], dtype=np.float32)
+            grown[:len(boxes)] = self._batch[:len(boxes)]
+            self._batch = grown
+
+        for (x, y, w, h) in faces:
+            x1, y1 = max(x - off_x, 0), max(y - off_y, 0)
+            x2, y2 = min(x + w + off_x, img_w), min(y + h + off_y, img_h)
+            face = gray[y1:y2, x1:x2]
+            if face.size == 0:
+                continue
+            self._batch[len(boxes), :, :, 0] = cv2.resize(face, self.target_size)
+            boxes.append([int(x), int(y), int(w), int(h)])
+
+    def detect_emotions(self, frame):
+        """Detect faces and classify emotions, returns [{'box': [...], 'emotions': {...}}]"""
+        return self.detect_emotions_batch([frame])[0]
+
+    def detect_emotions_batch(self, frames):
+        """detect_emotions() for several frames with a single classifier call, returns one list per frame"""
+        boxes = []
+        counts = []
+        for frame in frames:
+            start = len(boxes)
+            self._add_faces(frame, boxes)
+            counts.append(len(boxes) - start)
+
+        if not boxes:
+            return [[] for _ in frames]
+
+        # Normalize in place to [-1, 1] (FER preprocess_input with v2=True)
+        batch = self._batch[:len(boxes)]
+        batch *= 2.0 / 255.0
+        batch -= 1.0
+
+        # One native call for all faces of all frames
+        predictions = self.session.run(None, {self.input_name: batch})[0]
+
+        results = [
+            {
+                'box': box,
+                'emotions': {label: round(float(score), 2)
+                             for label, score in zip(EMOTION_LABELS, scores)}
+            }
+            for box, scores in zip(boxes, predictions)
+        ]
+
+        # Split back into per-frame lists
+        per_frame = []
+        start = 0
+        for count in counts:
+            per_frame.append(results[start:start + count])
+            start += count
+        return per_frame
@@ -0,0 +1,73 @@
+"""
+ONNX Runtime Face Detector
+UltraFace (version-RFB-320 / RFB-640 from the ONNX Model Zoo) as a faster
+stand-in for the Haar cascade. find_faces() matches FER.find_faces(), so it can
+replace FER's detector or be attached to ONNXEmotionDetector.face_model.
+Place the model at backend/ultraface.onnx
+"""
+
+import os
+import numpy as np
+import cv2
+import onnxruntime as ort
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(SCRIPT_DIR, 'ultraface.onnx')
+
+SCORE_THRESHOLD = 0.7  # Minimum face probability
+NMS_THRESHOLD = 0.3    # IoU above which overlapping boxes are merged
+
+
+class ORTFaceDetector:
+    """UltraFace face detection on the ONNX Runtime CPU execution provider"""
+
+    def __init__(self, model_path=MODEL_PATH, threads=None):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Face detection model not found: {model_path}")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Callers running several detectors at once should split the cores between them
+        options.intra_op_num_threads = threads or os.cpu_count() or 1
+        self.session = ort.InferenceSession(model_path, sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # NCHW: (1, 3, height, width)
+        _, _, height, width = model_input.shape
+        self.input_size = (int(width), int(height))
+
+        # Preallocated RGB frame and input blob, filled in place for every call
+        self._rgb = np.empty((int(height), int(width), 3), dtype=np.uint8)
+        self._blob = np.empty((1, 3, int(height), int(width)), dtype=np.float32)
+
+    def find_faces(self, img, bgr=True):
+        """Detect faces, returns an (N, 4) int32 array of (x, y, w, h) rectangles"""
+        img_h, img_w = img.shape[:2]
+        small = cv2.resize(img, self.input_size)
+        if small.ndim == 2:
+            cv2.cvtColor(small, cv2.COLOR_GRAY2RGB, dst=self._rgb)
+        elif bgr:
+            cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        else:
+            self._rgb[:] = small
+
+        # HWC uint8 -> NCHW, normalized to about [-1, 1] (UltraFace preprocessing)
+        np.subtract(self._rgb.transpose(2, 0, 1), 127.0, out=self._blob[0])
+        self._blob *= 1.0 / 128.0
+
+        scores, boxes = self.session.run(['scores', 'boxes'], {self.input_name: self._blob})
+        scores = scores[0, :, 1]
+        keep = scores > SCORE_THRESHOLD
+        if not keep.any():
+            return np.empty((0, 4), dtype=np.int32)
+
+        # Normalized (x1, y1, x2, y2) -> pixel (x, y, w, h), clipped to the frame
+        corners = np.clip(boxes[0, keep] * (img_w, img_h, img_w, img_h), 0, (img_w, img_h, img_w, img_h))
+        rects = np.empty_like(corners)
+        rects[:, :2] = corners[:, :2]
+        rects[:, 2:] = corners[:, 2:] - corners[:, :2]
+
+        indices = cv2.dnn.NMSBoxes(rects.tolist(), scores[keep].tolist(), SCORE_THRESHOLD, NMS_THRESHOLD)
+        return rects[np.asarray(indices, dtype=np.int64).reshape(-1)].astype(np.int32)
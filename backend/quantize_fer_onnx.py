@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Quantize the exported FER emotion classifier to int8 for onnx_emotion_detector.py
+Requires: pip install onnx onnxruntime (and fer_mini_xception.onnx from export_fer_onnx.py)
+Usage: python quantize_fer_onnx.py <calibration_image_dir>
+The directory should hold real photos containing faces - the int8 ranges are
+calibrated on the face crops found in them
+"""
+
+import os
+import sys
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FP32_MODEL_PATH = os.path.join(SCRIPT_DIR, 'fer_mini_xception.onnx')
+INT8_MODEL_PATH = os.path.join(SCRIPT_DIR, 'fer_mini_xception_int8.onnx')
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+def load_calibration_batches(image_dir, input_shape):
+    """Face crops preprocessed like ONNXEmotionDetector, one (1, H, W, 1) batch each"""
+    import cv2
+    from onnx_emotion_detector import FACE_OFFSETS
+    _, height, width, _ = input_shape
+    off_x, off_y = FACE_OFFSETS
+    # Same Haar cascade and parameters as ONNXEmotionDetector.find_faces
+    face_detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    batches = []
+
+    for name in sorted(os.listdir(image_dir)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        gray = cv2.imread(os.path.join(image_dir, name), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            continue
+        img_h, img_w = gray.shape[:2]
+        faces = face_detector.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(50, 50))
+        for x, y, w, h in faces:
+            x1, y1 = max(x - off_x, 0), max(y - off_y, 0)
+            x2, y2 = min(x + w + off_x, img_w), min(y + h + off_y, img_h)
+            face = gray[y1:y2, x1:x2]
+            if face.size == 0:
+                continue
+            face = cv2.resize(face, (width, height)).astype(np.float32)
+            batches.append((face * (2.0 / 255.0) - 1.0)[None, :, :, None])
+
+    return batches
+
+def quantize_model(image_dir):
+    """Statically quantize the FP32 ONNX model to int8 if it doesn't exist"""
+
+    if os.path.exists(INT8_MODEL_PATH):
+        print(f"✓ Model already exists: {INT8_MODEL_PATH}")
+        return True
+
+    if not os.path.exists(FP32_MODEL_PATH):
+        print(f"❌ FP32 model not found: {FP32_MODEL_PATH}")
+        print("   Run: python export_fer_onnx.py")
+        return False
+
+    try:
+        import onnxruntime as ort
+        from onnxruntime.quantization import (CalibrationDataReader, QuantFormat,
+                                              QuantType, quantize_static)
+    except ImportError as e:
+        print(f"❌ Missing dependency: {e}")
+        print("   Run: pip install onnx onnxruntime")
+        return False
+
+    if not image_dir or not os.path.isdir(image_dir):
+        print(f"❌ Calibration image directory not found: {image_dir}")
+        print("   Run: python quantize_fer_onnx.py <dir with face photos>")
+        return False
+
+    model_input = ort.InferenceSession(FP32_MODEL_PATH, providers=['CPUExecutionProvider']).get_inputs()[0]
+    batches = load_calibration_batches(image_dir, model_input.shape)
+    if not batches:
+        # Never write a model calibrated on anything but real faces
+        print(f"❌ No faces found in the calibration images: {image_dir}")
+        return False
+
+    class FaceDataReader(CalibrationDataReader):
+        """Feeds the calibration batches to the quantizer"""
+
+        def __init__(self):
+            self._feeds = iter({model_input.name: batch} for batch in batches)
+
+        def get_next(self):
+            return next(self._feeds, None)
+
+    print(f"Quantizing FER emotion model to int8...")
+    print(f"Source: {FP32_MODEL_PATH}")
+    print(f"Destination: {INT8_MODEL_PATH}")
+    print(f"Calibration face crops: {len(batches)}")
+
+    try:
+        # uint8 activations / int8 per-channel weights: the fast VNNI / dot-product path
+        quantize_static(FP32_MODEL_PATH, INT8_MODEL_PATH, FaceDataReader(),
+                        quant_format=QuantFormat.QDQ, per_channel=True,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+        print("✓ Model quantized successfully!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Error quantizing model: {e}")
+        if os.path.exists(INT8_MODEL_PATH):
+            os.remove(INT8_MODEL_PATH)
+        return False
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python quantize_fer_onnx.py <calibration_image_dir>")
+        sys.exit(2)
+    success = quantize_model(sys.argv[1])
+    sys.exit(0 if success else 1)
@@ -0,0 +1,37 @@
+"""
+JSON module for Flask-SocketIO packets
+Uses orjson when installed (serializes NumPy arrays natively), stdlib json otherwise
+"""
+
+import json
+import numpy as np
+
+# Try to load orjson (optional - falls back to stdlib json with a NumPy hook)
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    print("✓ orjson serializer available")
+except ImportError as e:
+    print(f"⚠️  orjson not available (using stdlib json): {e}")
+
+def _numpy_default(obj):
+    """Fallback conversion for NumPy values the encoder can't handle natively"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj, **kwargs):
+    """Serialize to a JSON str (extra stdlib kwargs like separators are ignored)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_numpy_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, default=_numpy_default, separators=(',', ':'))
+
+def loads(s, **kwargs):
+    """Parse a JSON str or bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(s)
+    return json.loads(s)
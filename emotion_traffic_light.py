@@ -1,47 +1,68 @@
+import os
+import sys
 import cv2
 import numpy as np
-from fer.fer import FER
 import pyttsx3
-from collections import deque, defaultdict
+from collections import deque
 import threading
+import queue
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from fer_cache import get_detector
+from _numba_compat import njit, NUMBA_AVAILABLE
+
+# Numba is optional - smooth_color runs as plain Python without it
+if NUMBA_AVAILABLE:
+    print("✓ Numba JIT available")
+else:
+    print("⚠️  Numba not available (smoothing runs in Python)")
 
 # Initialize
-emotion_detector = FER(mtcnn=False)
+emotion_detector = get_detector()
 
 # TTS in separate thread to avoid blocking
-tts_queue = []
-tts_lock = threading.Lock()
+# Holds at most one pending phrase - newer emotions replace it so speech never lags
+tts_queue = queue.Queue(maxsize=1)
 
 def tts_worker():
     """Background thread for text-to-speech"""
     engine = pyttsx3.init()
     engine.setProperty('rate', 150)
     while True:
-        with tts_lock:
-            if tts_queue:
-                text = tts_queue.pop(0)
-                engine.say(text)
-                engine.runAndWait()
-        time.sleep(0.1)
+        text = tts_queue.get()
+        engine.say(text)
+        engine.runAndWait()
 
 # Start TTS thread
 tts_thread = threading.Thread(target=tts_worker, daemon=True)
 tts_thread.start()
 
-# Load Haar Cascade for face detection
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-
 # Configuration
 PROCESS_EVERY_N_FRAMES = 3  # Process emotions every 3 frames for real-time feel
 INFERENCE_WIDTH = 320       # Lower resolution for faster inference
+INFERENCE_HEIGHT = 240      # Frames are letterboxed to exactly this size
 ROLLING_WINDOW_SIZE = 5     # Smaller window for more responsive colors
 MIN_CONFIDENCE = 0.25       # Minimum confidence to display
+CAMERA_PROBE_COUNT = 5      # Camera indices checked at startup
+MAX_FACES = 16              # Color history slots (reused round-robin when exceeded)
 
 # Face tracking - stores emotion data per face
 face_emotions = {}
 face_id_counter = 0
-color_histories = defaultdict(lambda: deque(maxlen=ROLLING_WINDOW_SIZE))
+# Color history ring buffers: one (ROLLING_WINDOW_SIZE, 3) slot per face, plus
+# the number of colors written to each slot (kept below 2 * ROLLING_WINDOW_SIZE)
+color_buf = np.zeros((MAX_FACES, ROLLING_WINDOW_SIZE, 3), dtype=np.uint8)
+color_idx = np.zeros(MAX_FACES, dtype=np.int32)
+face_slots = {}
+
+# Latest detection results, published by the detection worker thread
+latest_results = []
+results_lock = threading.Lock()
 
 def emotion_to_color(emotion):
     """Map emotion to traffic light color"""
@@ -55,65 +76,172 @@ def emotion_to_color(emotion):
     else:
         return (0, 0, 255)  # Red
 
+# Canonical emotion order (same as FER's labels)
+_EMOTION_ORDER = ('angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral')
+
+def _emotion_scores(emotions):
+    """Scores in _EMOTION_ORDER as a float64 vector, -inf for emotions not in the dict"""
+    return np.fromiter((emotions.get(name, -np.inf) for name in _EMOTION_ORDER),
+                       dtype=np.float64, count=len(_EMOTION_ORDER))
+
 def get_dominant_emotion(emotions):
     """Get the emotion with highest confidence"""
     if not emotions:
         return 'neutral', 0.0
-    max_emotion = max(emotions.items(), key=lambda x: x[1])
-    return max_emotion[0], max_emotion[1]
+    scores = _emotion_scores(emotions)
+    i = int(scores.argmax())
+    return _EMOTION_ORDER[i], float(scores[i])
 
 def get_top_emotions(emotions, top_n=3):
     """Get top N emotions sorted by confidence"""
-    sorted_emotions = sorted(emotions.items(), key=lambda x: x[1], reverse=True)
-    return sorted_emotions[:top_n]
+    scores = _emotion_scores(emotions)
+    n = min(top_n, np.count_nonzero(scores > -np.inf))
+    if n <= 0:
+        return []
+    top = np.argpartition(-scores, n - 1)[:n]
+    # Highest first, ties in canonical order
+    top = top[np.lexsort((top, -scores[top]))]
+    return [(_EMOTION_ORDER[i], float(scores[i])) for i in top]
+
+@njit(nogil=True, cache=True)
+def _smooth(buf, idx, face_slot, b, g, r):
+    """Write one color into the slot's ring buffer and return the integer mean of its history"""
+    history = buf.shape[1]
+    count = idx[face_slot]
+    pos = count % history
+    buf[face_slot, pos, 0] = b
+    buf[face_slot, pos, 1] = g
+    buf[face_slot, pos, 2] = r
+
+    count += 1
+    if count >= 2 * history:
+        count -= history
+    idx[face_slot] = count
+
+    n = min(count, history)
+    s0 = s1 = s2 = 0
+    for k in range(n):
+        s0 += int(buf[face_slot, k, 0])
+        s1 += int(buf[face_slot, k, 1])
+        s2 += int(buf[face_slot, k, 2])
+    return s0 // n, s1 // n, s2 // n
+
+# Compile now so the first frame doesn't pay the JIT cost
+_smooth(np.zeros((1, ROLLING_WINDOW_SIZE, 3), dtype=np.uint8), np.zeros(1, dtype=np.int32), 0, 0, 0, 0)
 
 def smooth_color(face_id, new_color):
     """Apply rolling average to stabilize color per face"""
-    color_histories[face_id].append(new_color)
-    avg_color = np.mean(color_histories[face_id], axis=0)
-    # Convert to tuple of Python ints (not numpy ints) for OpenCV
-    return (int(avg_color[0]), int(avg_color[1]), int(avg_color[2]))
+    slot = face_slots.get(face_id)
+    if slot is None:
+        # New face: take the next slot and clear whatever history it held
+        slot = face_slots[face_id] = len(face_slots) % MAX_FACES
+        color_idx[slot] = 0
 
-def resize_for_inference(frame, target_width=INFERENCE_WIDTH):
-    """Resize frame maintaining aspect ratio for faster processing"""
-    height, width = frame.shape[:2]
-    scale = target_width / width
-    new_height = int(height * scale)
-    return cv2.resize(frame, (target_width, new_height)), scale
+    b, g, r = _smooth(color_buf, color_idx, slot, new_color[0], new_color[1], new_color[2])
+    # Plain Python ints for OpenCV
+    return (int(b), int(g), int(r))
 
-def match_face_to_detected(x, y, w, h, detected_faces, tolerance=50):
-    """Match Haar cascade face to FER detected face"""
-    for i, det_face in enumerate(detected_faces):
-        box = det_face['box']
-        dx, dy, dw, dh = box
+def resize_for_inference(frame, target_width=INFERENCE_WIDTH, target_height=INFERENCE_HEIGHT):
+    """Letterbox frame to a fixed size so the detector always sees the same input shape
 
-        # Check if boxes overlap significantly
-        if (abs(x - dx) < tolerance and abs(y - dy) < tolerance):
-            return i
-    return None
+    Returns (small_frame, scale, (pad_x, pad_y)) for mapping boxes back
+    """
+    height, width = frame.shape[:2]
+    scale = min(target_width / width, target_height / height)
+    new_width = min(int(width * scale), target_width)
+    new_height = min(int(height * scale), target_height)
+    small = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
+
+    # Pad evenly to exactly target_width x target_height
+    pad_x = (target_width - new_width) // 2
+    pad_y = (target_height - new_height) // 2
+    small = cv2.copyMakeBorder(small, pad_y, target_height - new_height - pad_y,
+                               pad_x, target_width - new_width - pad_x,
+                               cv2.BORDER_CONSTANT, value=(0, 0, 0))
+    return small, scale, (pad_x, pad_y)
+
+def detection_worker(detect_queue, stop_event):
+    """Background thread for emotion detection on the most recent submitted frame"""
+    global latest_results
+    while not stop_event.is_set():
+        try:
+            small_frame, scale, (pad_x, pad_y) = detect_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+
+        try:
+            results = emotion_detector.detect_emotions(small_frame)
+        except Exception as e:
+            # Keep the worker alive and clear the overlay instead of drawing stale results
+            print(f"⚠️  Emotion detection failed: {type(e).__name__}: {e}")
+            with results_lock:
+                latest_results = []
+            continue
+
+        # Remove the letterbox padding and scale back coordinates for display
+        for result in results:
+            box = result['box']
+            result['box'] = [
+                int((box[0] - pad_x) / scale),
+                int((box[1] - pad_y) / scale),
+                int(box[2] / scale),
+                int(box[3] / scale)
+            ]
+
+        with results_lock:
+            latest_results = results
+
+def submit_for_detection(detect_queue, item):
+    """Hand a frame to the detection worker, replacing one it hasn't picked up yet"""
+    try:
+        detect_queue.get_nowait()
+    except queue.Empty:
+        pass
+    detect_queue.put_nowait(item)
 
 def speak_emotion(emotion):
-    """Add emotion to TTS queue"""
-    with tts_lock:
-        tts_queue.append(emotion)
+    """Add emotion to TTS queue, replacing a phrase that hasn't been spoken yet"""
+    try:
+        tts_queue.put_nowait(emotion)
+    except queue.Full:
+        try:
+            tts_queue.get_nowait()
+        except queue.Empty:
+            pass
+        tts_queue.put_nowait(emotion)
+
+def _probe_camera(i):
+    """Open camera i and read one frame, returns (i, width, height, backend) or None"""
+    cap = cv2.VideoCapture(i)
+    try:
+        if not cap.isOpened():
+            return None
+        ret, frame = cap.read()
+        if not ret:
+            return None
+        # Try to get camera name (if available)
+        backend = cap.getBackendName()
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return i, width, height, backend
+    finally:
+        cap.release()
 
 def list_cameras():
     """List available cameras"""
     print("\nScanning for available cameras...")
     available_cameras = []
 
-    for i in range(5):  # Check first 5 camera indices
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            ret, frame = cap.read()
-            if ret:
-                available_cameras.append(i)
-                # Try to get camera name (if available)
-                backend = cap.getBackendName()
-                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                print(f"  [{i}] Camera {i} - {width}x{height} ({backend})")
-            cap.release()
+    # Device opens block on the driver, not the CPU - probe all indices at once
+    with ThreadPoolExecutor(max_workers=CAMERA_PROBE_COUNT) as executor:
+        results = list(executor.map(_probe_camera, range(CAMERA_PROBE_COUNT)))
+
+    for result in results:
+        if result is None:
+            continue
+        i, width, height, backend = result
+        available_cameras.append(i)
+        print(f"  [{i}] Camera {i} - {width}x{height} ({backend})")
 
     return available_cameras
 
@@ -164,7 +292,7 @@ def main():
 
     print("✓ Camera connected successfully!")
     print("Configuration:")
-    print(f"  - Inference resolution: {INFERENCE_WIDTH}px width")
+    print(f"  - Inference resolution: {INFERENCE_WIDTH}x{INFERENCE_HEIGHT} (letterboxed)")
     print(f"  - Processing every {PROCESS_EVERY_N_FRAMES} frames")
     print(f"  - Rolling window: {ROLLING_WINDOW_SIZE} frames")
     print("\nControls:")
@@ -173,6 +301,13 @@ def main():
 
     frame_count = 0
     emotion_results = []
+
+    # Detection runs in its own thread so capture/display never wait on FER
+    detect_queue = queue.Queue(maxsize=1)
+    stop_event = threading.Event()
+    detector_thread = threading.Thread(target=detection_worker,
+                                       args=(detect_queue, stop_event), daemon=True)
+    detector_thread.start()
     last_spoken = {}
     tts_enabled = True
     fps_history = deque(maxlen=30)
@@ -185,26 +320,13 @@ def main():
             print("ERROR: Failed to grab frame")
             break
 
-        display_frame = frame.copy()
-
-        # Process emotions every N frames using lower resolution
+        # Submit every Nth frame at lower resolution to the detection worker
         if frame_count % PROCESS_EVERY_N_FRAMES == 0:
-            # Resize for faster inference
-            small_frame, scale = resize_for_inference(frame)
-
-            # Detect emotions on small frame
-            emotion_results = emotion_detector.detect_emotions(small_frame)
-
-            # Scale back coordinates for display
-            if emotion_results:
-                for result in emotion_results:
-                    box = result['box']
-                    result['box'] = [
-                        int(box[0] / scale),
-                        int(box[1] / scale),
-                        int(box[2] / scale),
-                        int(box[3] / scale)
-                    ]
+            submit_for_detection(detect_queue, resize_for_inference(frame))
+
+        # Draw with whatever the worker finished last
+        with results_lock:
+            emotion_results = latest_results
 
         # Draw rectangles and labels for each detected face
         for i, result in enumerate(emotion_results):
@@ -228,7 +350,7 @@ def main():
                 # Only display if confidence is above threshold
                 if confidence > MIN_CONFIDENCE:
                     # Draw rectangle around face
-                    cv2.rectangle(display_frame, (x, y), (x+w, y+h), color, 3)
+                    cv2.rectangle(frame, (x, y), (x+w, y+h), color, 3)
 
                     # Prepare emotion text with score
                     emotion_text = f"{dominant_emotion.upper()}: {confidence:.2f}"
@@ -238,7 +360,7 @@ def main():
 
                     # Draw main emotion label above face
                     label_y = max(y - 10, 20)
-                    cv2.putText(display_frame, emotion_text, (x, label_y),
+                    cv2.putText(frame, emotion_text, (x, label_y),
                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
 
                     # Draw top emotions on the side of face
@@ -247,14 +369,14 @@ def main():
 
                     for idx, (emotion, score) in enumerate(top_emotions):
                         detail_text = f"{emotion}: {score:.2f}"
-                        cv2.putText(display_frame, detail_text,
+                        cv2.putText(frame, detail_text,
                                    (detail_x, detail_y + idx * 25),
                                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
 
                     # Traffic light indicator for this face
                     circle_x = x + w - 20
                     circle_y = y + 20
-                    cv2.circle(display_frame, (circle_x, circle_y), 15, color, -1)
+                    cv2.circle(frame, (circle_x, circle_y), 15, color, -1)
 
                     # Speak emotion if changed (non-blocking)
                     face_key = f"face_{i}"
@@ -277,18 +399,18 @@ def main():
 
         # Display info panel
         info_y = 30
-        cv2.putText(display_frame, f"FPS: {avg_fps:.1f}", (10, info_y),
+        cv2.putText(frame, f"FPS: {avg_fps:.1f}", (10, info_y),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
 
-        cv2.putText(display_frame, f"Faces: {len(emotion_results)}", (10, info_y + 30),
+        cv2.putText(frame, f"Faces: {len(emotion_results)}", (10, info_y + 30),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
 
         tts_status = "ON" if tts_enabled else "OFF"
-        cv2.putText(display_frame, f"TTS: {tts_status}", (10, info_y + 60),
+        cv2.putText(frame, f"TTS: {tts_status}", (10, info_y + 60),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
 
         # Display frame
-        cv2.imshow('Emotion Traffic Light - Real-time Detection', display_frame)
+        cv2.imshow('Emotion Traffic Light - Real-time Detection', frame)
 
         frame_count += 1
 
@@ -301,6 +423,8 @@ def main():
             print(f"TTS {'enabled' if tts_enabled else 'disabled'}")
 
     # Cleanup
+    stop_event.set()
+    detector_thread.join(timeout=2.0)
     cap.release()
     cv2.destroyAllWindows()
     print("\n✓ Camera released successfully")
@@ -0,0 +1,43 @@
+"""
+Shared emotion detector for the standalone scripts and tests
+The detector is built once per process. On first use the FER classifier is
+exported to ONNX (backend/export_fer_onnx.py), so later runs load it with ONNX
+Runtime instead of re-initializing TensorFlow.
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+_fer = None
+_detector = None
+
+def get_fer():
+    """Return the process-wide FER(mtcnn=False) instance"""
+    global _fer
+    if _fer is None:
+        from fer.fer import FER
+        _fer = FER(mtcnn=False)
+    return _fer
+
+def get_detector(threads=None, int8=False):
+    """Return the process-wide emotion detector - ONNX Runtime if possible, FER otherwise
+    threads caps the ONNX Runtime intra-op pool and int8 selects the quantized model;
+    both only apply on first creation"""
+    global _detector
+    if _detector is None:
+        try:
+            from onnx_emotion_detector import ONNXEmotionDetector
+            from export_fer_onnx import export_model
+            if not export_model():
+                raise RuntimeError("FER model could not be exported to ONNX")
+            _detector = ONNXEmotionDetector(threads=threads, int8=int8)
+            print("✓ ONNX Runtime emotion detector loaded")
+        except Exception as e:
+            print(f"⚠️  ONNX emotion detector not available: {e}")
+            print("   Falling back to FER (TensorFlow)...")
+            _detector = get_fer()
+    return _detector
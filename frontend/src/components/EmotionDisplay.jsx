@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { io } from 'socket.io-client';
+import { useFrameUrl } from '../utils/frameUrl';
 
 const BACKEND_URL = 'http://localhost:5001';
 
@@ -11,7 +12,7 @@ const EmotionDisplay = () => {
   const [fps, setFps] = useState(0);
   const [faceCount, setFaceCount] = useState(0);
   const [socket, setSocket] = useState(null);
-  const [currentFrame, setCurrentFrame] = useState(null);
+  const [currentFrame, setCurrentFrame] = useFrameUrl();
 
   // Initialize socket connection
   useEffect(() => {
@@ -159,7 +160,7 @@ const stopCamera = async () => {
         <div style={styles.videoContainer}>
           {isStreaming && currentFrame ? (
             <img
-              src={`data:image/jpeg;base64,${currentFrame}`}
+              src={currentFrame}
               alt="Emotion Detection Stream"
               style={styles.video}
             />
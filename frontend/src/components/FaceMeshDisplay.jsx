@@ -1,5 +1,6 @@
 import React, { useEffect, useState, useRef } from 'react';
 import { io } from 'socket.io-client';
+import { useFrameUrl } from '../utils/frameUrl';
 import FaceMesh3D from './FaceMesh3D';
 import FlameMeshViewer from './FlameMeshViewer';
 import FeatureGraphs from './FeatureGraphs';
@@ -17,7 +18,7 @@ const FaceMeshDisplay = () => {
   const [socket, setSocket] = useState(null);
   const [meshAvailable, setMeshAvailable] = useState(false);
   const [lastNarration, setLastNarration] = useState(null);
-  const [currentFrame, setCurrentFrame] = useState(null);
+  const [currentFrame, setCurrentFrame] = useFrameUrl();
 
   const audioRef = useRef(new SpeechSynthesisUtterance());
 
@@ -227,7 +228,7 @@ const FaceMeshDisplay = () => {
             <h3 style={styles.sectionTitle}>2D Camera Feed</h3>
             {isStreaming && currentFrame ? (
               <img
-                src={`data:image/jpeg;base64,${currentFrame}`}
+                src={currentFrame}
                 alt="Face Mesh Stream"
                 style={styles.video}
               />
@@ -9,6 +9,7 @@
 
 import { useEffect, useState, useRef } from 'react';
 import { io } from 'socket.io-client';
+import { useFrameUrl } from '../utils/frameUrl';
 import FlameMeshViewer from './FlameMeshViewer';
 
 const BACKEND_URL = 'http://localhost:5001';
@@ -23,7 +24,7 @@ const FlameReconPanel = () => {
   const [isStreaming, setIsStreaming] = useState(false);
   const [, setSocket] = useState(null);
   const [flameMeshData, setFlameMeshData] = useState(null);
-  const [currentFrame, setCurrentFrame] = useState(null);
+  const [currentFrame, setCurrentFrame] = useFrameUrl();
   const [landmarks3d, setLandmarks3d] = useState(null);
   const [faceRotationMatrix, setFaceRotationMatrix] = useState(null);
 
@@ -87,7 +88,7 @@ const FlameReconPanel = () => {
     const canvas = canvasRef.current;
     const ctx = canvas.getContext('2d');
 
-    // Create image from base64 frame
+    // Create image from the frame's object URL
     const img = new Image();
     img.onload = () => {
       // Set canvas size to match image
@@ -102,7 +103,7 @@ const FlameReconPanel = () => {
         drawLandmarks(ctx, landmarks3d);
       }
     };
-    img.src = `data:image/jpeg;base64,${currentFrame}`;
+    img.src = currentFrame;
   }, [currentFrame, landmarks3d, showLandmarks]);
 
   const drawLandmarks = (ctx, landmarks) => {
@@ -0,0 +1,55 @@
+/**
+ * Frame URL Utility
+ * Turns binary JPEG frames received over Socket.IO into <img>-ready object URLs
+ */
+
+import { useCallback, useEffect, useRef, useState } from 'react';
+
+/**
+ * Create an object URL for a JPEG frame
+ * @param {ArrayBuffer} frameBytes - Raw JPEG bytes from the backend
+ * @returns {string} Object URL usable as an image src
+ */
+export function createFrameUrl(frameBytes) {
+  return URL.createObjectURL(new Blob([frameBytes], { type: 'image/jpeg' }));
+}
+
+/**
+ * Hold the object URL of the latest frame and release old ones safely
+ * A URL is only revoked after a newer one has rendered (or on unmount), and
+ * frames replaced before they ever rendered are revoked right away.
+ * @returns {[string|null, function(ArrayBuffer|null): void]} Current URL and a setter
+ *   taking frame bytes (null clears the frame)
+ */
+export function useFrameUrl() {
+  const [frameUrl, setFrameUrl] = useState(null);
+  const latestRef = useRef(null);     // Newest URL created by setFrame
+  const committedRef = useRef(null);  // URL of the last rendered frame
+
+  // Called from socket handlers - side effects stay out of the state updater
+  const setFrame = useCallback((frameBytes) => {
+    const pending = latestRef.current;
+    if (pending && pending !== committedRef.current) {
+      URL.revokeObjectURL(pending);
+    }
+    const url = frameBytes ? createFrameUrl(frameBytes) : null;
+    latestRef.current = url;
+    setFrameUrl(url);
+  }, []);
+
+  // Revoke each rendered URL once the next one has rendered, or on unmount
+  useEffect(() => {
+    committedRef.current = frameUrl;
+    if (!frameUrl) return undefined;
+    return () => URL.revokeObjectURL(frameUrl);
+  }, [frameUrl]);
+
+  // A frame still waiting to render when the component unmounts
+  useEffect(() => () => {
+    if (latestRef.current && latestRef.current !== committedRef.current) {
+      URL.revokeObjectURL(latestRef.current);
+    }
+  }, []);
+
+  return [frameUrl, setFrame];
+}
@@ -0,0 +1,43 @@
+"""
+Shared test inputs for the standalone test scripts
+Dummy frames are built once and reused (read-only - copy before drawing on them)
+Cameras are opened once per run and released at exit
+"""
+
+import atexit
+from functools import lru_cache
+import cv2
+import numpy as np
+
+FRAME_SHAPE = (480, 640, 3)
+
+@lru_cache(maxsize=None)
+def get_dummy_frame(kind='black'):
+    """Return a cached read-only 640x480 BGR frame: 'black', 'gray' or fixed-seed 'noise'"""
+    if kind == 'black':
+        frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+    elif kind == 'gray':
+        frame = np.full(FRAME_SHAPE, 128, dtype=np.uint8)
+    elif kind == 'noise':
+        frame = np.random.default_rng(0).integers(0, 256, FRAME_SHAPE, dtype=np.uint8)
+    else:
+        raise ValueError(f"Unknown dummy frame kind: {kind}")
+    frame.setflags(write=False)
+    return frame
+
+# Open cameras by index, shared by every test in this process
+_cameras = {}
+
+def get_shared_cam(index=0):
+    """Return a VideoCapture for camera index that stays open for the whole run (don't release it)"""
+    cap = _cameras.get(index)
+    if cap is None or not cap.isOpened():
+        cap = _cameras[index] = cv2.VideoCapture(index)
+    return cap
+
+@atexit.register
+def release_shared_cams():
+    """Release every shared camera"""
+    for cap in _cameras.values():
+        cap.release()
+    _cameras.clear()
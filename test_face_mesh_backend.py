@@ -3,20 +3,48 @@
 Test Face Mesh Backend - Diagnostic Script
 """
 
-import requests
+import httpx
 import socketio
-import time
 import json
+import asyncio
 
 BACKEND_URL = 'http://localhost:5001'
+EVENT_TIMEOUT = 10     # Seconds to wait for the first face_mesh_update
+TARGET_UPDATES = 5     # Updates to collect once events are flowing
+DRAIN_TIMEOUT = 1.0    # Extra seconds allowed to reach TARGET_UPDATES
+HTTP_TIMEOUT = 10      # Seconds for the JSON endpoints (camera scan can be slow)
+FEED_TIMEOUT = 2       # Seconds to wait for the video feed headers
 
-def test_face_mesh_available():
+async def _fetch(client, path, stream=False, timeout=HTTP_TIMEOUT):
+    """GET path, returns the response or the exception it raised"""
+    try:
+        if stream:
+            # Headers only - close the MJPEG stream right away
+            request = client.build_request('GET', path, timeout=timeout)
+            response = await client.send(request, stream=True)
+            await response.aclose()
+            return response
+        return await client.get(path, timeout=timeout)
+    except Exception as e:
+        return e
+
+async def _all_probes():
+    """Fetch the availability, camera and video feed endpoints concurrently"""
+    async with httpx.AsyncClient(base_url=BACKEND_URL) as client:
+        return await asyncio.gather(
+            _fetch(client, '/api/face_mesh/available'),
+            _fetch(client, '/api/cameras'),
+            _fetch(client, '/face_mesh_feed', stream=True, timeout=FEED_TIMEOUT),
+        )
+
+def check_face_mesh_available(response):
     """Test if face mesh is available"""
     print("1. Testing Face Mesh Availability...")
     print("-" * 60)
     
     try:
-        response = requests.get(f"{BACKEND_URL}/api/face_mesh/available")
+        if isinstance(response, Exception):
+            raise response
         data = response.json()
         
         if data['available']:
@@ -30,13 +58,14 @@ def test_face_mesh_available():
         print(f"❌ Error: {e}")
         return False
 
-def test_cameras():
+def check_cameras(response):
     """Test camera detection"""
     print("\n2. Testing Camera Detection...")
     print("-" * 60)
     
     try:
-        response = requests.get(f"{BACKEND_URL}/api/cameras")
+        if isinstance(response, Exception):
+            raise response
         cameras = response.json()
         
         print(f"✓ Found {len(cameras)} camera(s):")
@@ -48,20 +77,33 @@ def test_cameras():
         print(f"❌ Error: {e}")
         return []
 
+async def _wait_event(event, timeout):
+    """Wait for an asyncio.Event, returns False on timeout"""
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
 def test_websocket_connection():
     """Test WebSocket connection and face mesh updates"""
     print("\n3. Testing WebSocket Connection...")
     print("-" * 60)
-    
-    sio = socketio.Client()
+    return asyncio.run(_websocket_connection())
+
+async def _websocket_connection():
+    """Async body of test_websocket_connection (socketio.AsyncClient)"""
+    sio = socketio.AsyncClient()
     received_data = []
+    got_event = asyncio.Event()
+    got_enough = asyncio.Event()
     
     @sio.on('connect')
-    def on_connect():
+    async def on_connect():
         print("✓ WebSocket connected")
     
     @sio.on('face_mesh_update')
-    def on_face_mesh_update(data):
+    async def on_face_mesh_update(data):
         print(f"✓ Received face_mesh_update:")
         print(f"   - FPS: {data.get('fps', 'N/A')}")
         print(f"   - Face Count: {data.get('face_count', 0)}")
@@ -78,17 +120,22 @@ def test_websocket_connection():
             print(f"     • Geometry Features: {list(face.get('geometry_features', {}).keys())}")
         
         received_data.append(data)
+        got_event.set()
+        if len(received_data) >= TARGET_UPDATES:
+            got_enough.set()
     
     @sio.on('disconnect')
-    def on_disconnect():
+    async def on_disconnect():
         print("⚠️  WebSocket disconnected")
     
     try:
-        sio.connect(BACKEND_URL)
+        await sio.connect(BACKEND_URL)
         print("   Listening for face_mesh_update events...")
-        print("   (Waiting 10 seconds for data...)")
+        print(f"   (Waiting up to {EVENT_TIMEOUT} seconds for data...)")
         
-        time.sleep(10)
+        # Return as soon as events arrive instead of sleeping the full timeout
+        if await _wait_event(got_event, EVENT_TIMEOUT):
+            await _wait_event(got_enough, DRAIN_TIMEOUT)
         
         if received_data:
             print(f"\n✓ Received {len(received_data)} updates")
@@ -98,24 +145,25 @@ def test_websocket_connection():
             print("   1. Camera is started via /api/face_mesh/start/<camera_id>")
             print("   2. A face is visible to the camera")
         
-        sio.disconnect()
+        await sio.disconnect()
         return len(received_data) > 0
         
     except Exception as e:
         print(f"❌ Error: {e}")
         return False
 
-def test_video_feed():
+def check_video_feed(response):
     """Test if video feed endpoint exists"""
     print("\n4. Testing Video Feed Endpoint...")
     print("-" * 60)
     
     try:
-        response = requests.get(f"{BACKEND_URL}/face_mesh_feed", stream=True, timeout=2)
+        if isinstance(response, Exception):
+            raise response
         print(f"✓ Video feed endpoint accessible")
         print(f"   Content-Type: {response.headers.get('Content-Type')}")
         return True
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         print("⚠️  Video feed endpoint exists but no stream (camera not started)")
         return True
     except Exception as e:
@@ -127,19 +175,22 @@ def main():
     print("Face Mesh Backend Diagnostic Test")
     print("=" * 60)
     
+    # The three HTTP checks are independent - fetch them all at once
+    available_response, cameras_response, feed_response = asyncio.run(_all_probes())
+    
     # Test 1: Face Mesh Available
-    if not test_face_mesh_available():
+    if not check_face_mesh_available(available_response):
         print("\n❌ Face Mesh not available. Cannot continue tests.")
         return 1
     
     # Test 2: Cameras
-    cameras = test_cameras()
+    cameras = check_cameras(cameras_response)
     if not cameras:
         print("\n❌ No cameras found. Cannot continue tests.")
         return 1
     
     # Test 3: Video Feed
-    test_video_feed()
+    check_video_feed(feed_response)
     
     # Test 4: WebSocket
     print("\n" + "=" * 60)
@@ -5,7 +5,29 @@ without requiring camera access.
 """
 
 import sys
-import numpy as np
+from shared_fixtures import get_dummy_frame
+
+# emotion_traffic_light loaded once and shared by the tests below
+_MODULE = None
+
+def _get_module():
+    """Load emotion_traffic_light.py from this directory once (runs its module-level code)"""
+    global _MODULE
+    if _MODULE is None:
+        import os
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(
+            "emotion_traffic_light", 
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "emotion_traffic_light.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        
+        # This will execute the module but not the if __name__ == "__main__" block
+        spec.loader.exec_module(module)
+        # Later "import emotion_traffic_light" statements reuse this instance
+        sys.modules["emotion_traffic_light"] = module
+        _MODULE = module
+    return _MODULE
 
 def test_fer_import():
     """Test that FER can be imported successfully"""
@@ -22,8 +44,8 @@ def test_fer_initialization():
     """Test that FER can be initialized"""
     print("\nTesting FER initialization...")
     try:
-        from fer.fer import FER
-        detector = FER(mtcnn=False)
+        from fer_cache import get_fer
+        detector = get_fer()
         print("✓ FER detector initialized successfully")
         return True
     except Exception as e:
@@ -34,13 +56,13 @@ def test_emotion_detection_with_dummy_image():
     """Test emotion detection with a dummy image"""
     print("\nTesting emotion detection with dummy image...")
     try:
-        from fer.fer import FER
+        from fer_cache import get_detector
         import cv2
         
         # Create a dummy image (black image)
-        dummy_image = np.zeros((480, 640, 3), dtype=np.uint8)
+        dummy_image = get_dummy_frame('black')
         
-        detector = FER(mtcnn=False)
+        detector = get_detector()
         result = detector.detect_emotions(dummy_image)
         
         print(f"✓ Emotion detection completed. Result: {result}")
@@ -62,15 +84,7 @@ def test_emotion_traffic_light_imports():
         
         # Try importing the module (this will execute module-level code)
         # We'll use importlib to avoid executing the main() function
-        import importlib.util
-        spec = importlib.util.spec_from_file_location(
-            "emotion_traffic_light", 
-            os.path.join(os.path.dirname(__file__), "emotion_traffic_light.py")
-        )
-        module = importlib.util.module_from_spec(spec)
-        
-        # This will execute the module but not the if __name__ == "__main__" block
-        spec.loader.exec_module(module)
+        _get_module()
         
         print("✓ emotion_traffic_light.py imported successfully")
         print("✓ All module-level code executed without errors")
@@ -85,15 +99,7 @@ def test_helper_functions():
     """Test helper functions from emotion_traffic_light.py"""
     print("\nTesting helper functions...")
     try:
-        import importlib.util
-        import os
-        
-        spec = importlib.util.spec_from_file_location(
-            "emotion_traffic_light", 
-            os.path.join(os.path.dirname(__file__), "emotion_traffic_light.py")
-        )
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        module = _get_module()
         
         # Test emotion_to_color function
         green = module.emotion_to_color('happy')
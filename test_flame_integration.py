@@ -10,8 +10,8 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
 import cv2
-import numpy as np
 from face_mesh_analyzer import FaceMeshAnalyzer
+from shared_fixtures import get_dummy_frame
 
 def test_flame_integration():
     print("=" * 60)
@@ -29,8 +29,7 @@ def test_flame_integration():
 
     # Create a test frame (black image)
     print("\n2. Creating test frame...")
-    test_frame = np.zeros((480, 640, 3), dtype=np.uint8)
-    test_frame[:] = (128, 128, 128)  # Gray background
+    test_frame = get_dummy_frame('gray')  # Gray background
     print("   ✓ Test frame created (640x480)")
 
     # Process frame (will likely not detect face, but tests the pipeline)
@@ -5,90 +5,144 @@ Test script to verify backend and frontend can start without errors
 
 import sys
 import os
-import subprocess
+import io
+import contextlib
+import importlib
+import importlib.util
+import logging
+import threading
 import time
+from collections import deque
+from pathlib import Path
+
+# Repository root - all path checks are absolute, so no test depends on the cwd
+ROOT = Path(__file__).resolve().parent
+
+SEPARATOR = "=" * 60
+SUBSEPARATOR = "-" * 60
+PASS_LABEL = "✓ PASS"
+FAIL_LABEL = "❌ FAIL"
+
+FACE_MESH_WARNING = "Face mesh analyzer not available"
+IMPORT_LOG_TAIL = 200  # Output writes kept for the failure report
+IMPORT_TIMEOUT = 30    # Seconds to wait for the backend import
+
+class _ImportLog(io.TextIOBase):
+    """Output sink for the backend import - flags the face mesh warning as it is
+    written and keeps only the tail of the Python-level output (native TF/CUDA
+    logging writes straight to fd 2 and is not captured)"""
+
+    def __init__(self):
+        self.face_mesh_disabled = False
+        self._tail = deque(maxlen=IMPORT_LOG_TAIL)
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        if not self.face_mesh_disabled and FACE_MESH_WARNING in text:
+            self.face_mesh_disabled = True
+        self._tail.append(text)
+        return len(text)
+
+    def getvalue(self):
+        return ''.join(self._tail)
 
 def test_backend_imports():
     """Test that backend can be imported without errors"""
     print("Testing backend imports...")
-    print("-" * 60)
+    print(SUBSEPARATOR)
     
+    backend_dir = str(ROOT / 'backend')
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+
+    # Import in this interpreter (no subprocess); the module stays cached in sys.modules.
+    # It runs on a daemon thread so a hanging import is bounded by IMPORT_TIMEOUT
+    errors = []
+
+    def import_app():
+        try:
+            importlib.import_module('app')
+        except BaseException as e:
+            errors.append(e)
+
+    output = _ImportLog()
+    cwd = os.getcwd()
+    importer = threading.Thread(target=import_app, daemon=True)
     try:
-        # Change to backend directory
-        os.chdir('backend')
-        
-        # Try importing the app
-        result = subprocess.run(
-            ['python', '-c', 'from app import app; print("✓ Backend imports successfully")'],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        # Go back to parent directory
-        os.chdir('..')
-        
-        if result.returncode == 0:
-            print("✓ Backend imports successfully")
-            if "Face mesh analyzer not available" in result.stderr:
-                print("  ⚠️  Face mesh analyzer disabled (this is OK)")
-            print("  ✓ FER emotion detector loaded")
-            return True
-        else:
-            print("❌ Backend import failed:")
-            print(result.stderr)
-            return False
-            
-    except subprocess.TimeoutExpired:
-        print("❌ Backend import timed out")
-        os.chdir('..')
+        os.chdir(backend_dir)
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            importer.start()
+            importer.join(IMPORT_TIMEOUT)
+    finally:
+        os.chdir(cwd)
+        # logging.basicConfig in app.py bound its handler to the capture sink -
+        # point it back at the real stderr so later logging isn't swallowed
+        for handler in logging.root.handlers:
+            if isinstance(handler, logging.StreamHandler) and handler.stream is output:
+                handler.setStream(sys.stderr)
+
+    if importer.is_alive():
+        print(f"❌ Backend import timed out after {IMPORT_TIMEOUT}s")
         return False
-    except Exception as e:
-        print(f"❌ Error testing backend: {e}")
-        os.chdir('..')
+
+    if errors:
+        e = errors[0]
+        print("❌ Backend import failed:")
+        print(output.getvalue())
+        print(f"{type(e).__name__}: {e}")
         return False
 
+    print("✓ Backend imports successfully")
+    if output.face_mesh_disabled:
+        print("  ⚠️  Face mesh analyzer disabled (this is OK)")
+    # ONNX Runtime is the primary detector, FER (TensorFlow) the fallback
+    detector = getattr(sys.modules['app'], 'emotion_detector', None)
+    if detector is None:
+        print("  ⚠️  No emotion detector found in app")
+    else:
+        print(f"  ✓ Emotion detector loaded: {type(detector).__name__}")
+    return True
+
 def test_frontend_dependencies():
     """Test that frontend dependencies are installed"""
     print("\nTesting frontend dependencies...")
-    print("-" * 60)
+    print(SUBSEPARATOR)
     
+    # One directory read answers both checks
     try:
-        os.chdir('frontend')
-        
-        # Check if node_modules exists
-        if not os.path.exists('node_modules'):
-            print("❌ node_modules not found")
-            print("   Run: cd frontend && npm install")
-            os.chdir('..')
-            return False
-        
-        # Check if package.json exists
-        if not os.path.exists('package.json'):
-            print("❌ package.json not found")
-            os.chdir('..')
-            return False
-        
-        print("✓ Frontend dependencies installed")
-        os.chdir('..')
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error testing frontend: {e}")
-        os.chdir('..')
+        with os.scandir(ROOT / 'frontend') as it:
+            entries = {entry.name for entry in it}
+    except FileNotFoundError:
+        entries = set()
+    
+    # Check if node_modules exists
+    if 'node_modules' not in entries:
+        print("❌ node_modules not found")
+        print("   Run: cd frontend && npm install")
+        return False
+    
+    # Check if package.json exists
+    if 'package.json' not in entries:
+        print("❌ package.json not found")
         return False
+    
+    print("✓ Frontend dependencies installed")
+    return True
 
 def test_venv_activation():
     """Test that virtual environment exists and can be activated"""
     print("\nTesting virtual environment...")
-    print("-" * 60)
+    print(SUBSEPARATOR)
     
-    if not os.path.exists('venv'):
+    venv_dir = ROOT / 'venv'
+    if not venv_dir.exists():
         print("❌ Virtual environment not found")
         print("   Create it with: python3 -m venv venv")
         return False
     
-    if not os.path.exists('venv/bin/activate'):
+    if not (venv_dir / 'bin' / 'activate').exists():
         print("❌ Virtual environment activation script not found")
         return False
     
@@ -98,7 +152,7 @@ def test_venv_activation():
 def test_required_packages():
     """Test that required Python packages are installed"""
     print("\nTesting required Python packages...")
-    print("-" * 60)
+    print(SUBSEPARATOR)
     
     required_packages = [
         'flask',
@@ -109,51 +163,51 @@ def test_required_packages():
         'fer.fer',
     ]
     
+    # Existence only: find_spec locates the top-level package without running it
+    # (no native cv2 libraries, no TensorFlow for fer)
     all_installed = True
     for package in required_packages:
         try:
-            result = subprocess.run(
-                ['python', '-c', f'import {package}; print("✓ {package}")'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode == 0:
-                print(f"  ✓ {package}")
-            else:
-                print(f"  ❌ {package} - not installed")
-                all_installed = False
-        except Exception as e:
+            installed = importlib.util.find_spec(package.split('.')[0]) is not None
+        except (ImportError, ValueError) as e:
             print(f"  ❌ {package} - error: {e}")
             all_installed = False
+            continue
+        if installed:
+            print(f"  ✓ {package}")
+        else:
+            print(f"  ❌ {package} - not installed")
+            all_installed = False
     
     return all_installed
 
+# Written in one call instead of a print() per line
+STARTUP_INSTRUCTIONS = "\n".join([
+    "\n" + SEPARATOR,
+    "How to Start the Application",
+    SEPARATOR,
+    "\n1. Start Backend (Terminal 1):",
+    "   ./start_backend.sh",
+    "\n2. Start Frontend (Terminal 2):",
+    "   ./start_frontend.sh",
+    "\n3. Open Browser:",
+    "   http://localhost:5173",
+    "\n4. Select Camera and Click 'Start Camera'",
+    "\nExpected Output:",
+    "  - Backend: Running on http://localhost:5001",
+    "  - Frontend: Running on http://localhost:5173",
+    "  - Browser: Camera dropdown with available cameras",
+]) + "\n"
+
 def print_startup_instructions():
     """Print instructions for starting the application"""
-    print("\n" + "=" * 60)
-    print("How to Start the Application")
-    print("=" * 60)
-    print("\n1. Start Backend (Terminal 1):")
-    print("   ./start_backend.sh")
-    print("\n2. Start Frontend (Terminal 2):")
-    print("   ./start_frontend.sh")
-    print("\n3. Open Browser:")
-    print("   http://localhost:5173")
-    print("\n4. Select Camera and Click 'Start Camera'")
-    print("\nExpected Output:")
-    print("  - Backend: Running on http://localhost:5001")
-    print("  - Frontend: Running on http://localhost:5173")
-    print("  - Browser: Camera dropdown with available cameras")
+    sys.stdout.write(STARTUP_INSTRUCTIONS)
 
 def main():
     """Run all tests"""
-    print("=" * 60)
+    print(SEPARATOR)
     print("Emotion Traffic Light - Startup Test")
-    print("=" * 60)
-    
-    # Save current directory
-    original_dir = os.getcwd()
+    print(SEPARATOR)
     
     tests = [
         ("Virtual Environment", test_venv_activation),
@@ -162,30 +216,27 @@ def main():
         ("Frontend Dependencies", test_frontend_dependencies),
     ]
     
+    # Sequential on purpose: test_backend_imports swaps the process-wide cwd and
+    # stdout/stderr, and the other checks are only stat()/find_spec lookups
     results = []
     for test_name, test_func in tests:
         try:
-            # Make sure we're in the original directory
-            os.chdir(original_dir)
             result = test_func()
             results.append((test_name, result))
         except Exception as e:
             print(f"❌ Test '{test_name}' crashed: {e}")
             results.append((test_name, False))
-            os.chdir(original_dir)
-    
-    # Make sure we're back in original directory
-    os.chdir(original_dir)
     
-    print("\n" + "=" * 60)
+    print("\n" + SEPARATOR)
     print("Test Summary")
-    print("=" * 60)
+    print(SEPARATOR)
     
+    passed = 0
     for test_name, result in results:
-        status = "✓ PASS" if result else "❌ FAIL"
+        status = PASS_LABEL if result else FAIL_LABEL
         print(f"{status}: {test_name}")
+        passed += bool(result)
     
-    passed = sum(1 for _, result in results if result)
     total = len(results)
     
     print(f"\nPassed: {passed}/{total}")
@@ -3,24 +3,79 @@
 Test script to verify the web backend is working correctly
 """
 
-import requests
 import json
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 BACKEND_URL = 'http://localhost:5001'
+REQUEST_TIMEOUT = 5  # Seconds per HTTP probe
+CACHE_TTL = 2.0      # Seconds a GET result is reused by later probes of the same path
 
-def test_backend_connection():
+SEPARATOR = "=" * 60
+
+# requests (urllib3, ssl, charset detection...) is only imported once a probe runs
+_requests = None
+_session = None
+
+def _get_requests():
+    """Import the requests module on first use"""
+    global _requests
+    if _requests is None:
+        import requests
+        _requests = requests
+    return _requests
+
+def _get_session():
+    """Return the keep-alive session shared by every probe, created on first use"""
+    global _session
+    if _session is None:
+        requests = _get_requests()
+        from requests.adapters import HTTPAdapter
+        _session = requests.Session()
+        # Enough pooled connections for the concurrent requests in main()
+        _session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    return _session
+
+def _request(session, method, path):
+    """Issue one request to the backend, returns the response or the exception raised"""
+    try:
+        return session.request(method, f"{BACKEND_URL}{path}", timeout=REQUEST_TIMEOUT)
+    except Exception as e:
+        return e
+
+# GET results keyed by path: (fetched_at, response or exception)
+_cache = {}
+_cache_locks = {}
+
+def _fetch(session, method, path):
+    """Like _request, but GET results are shared for CACHE_TTL seconds"""
+    if method != 'GET':
+        return _request(session, method, path)
+
+    # Concurrent probes of the same path wait for the first one instead of duplicating it
+    with _cache_locks.setdefault(path, threading.Lock()):
+        entry = _cache.get(path)
+        if entry is not None and time.monotonic() - entry[0] < CACHE_TTL:
+            return entry[1]
+        result = _request(session, method, path)
+        _cache[path] = (time.monotonic(), result)
+        return result
+
+def check_backend_connection(response):
     """Test if backend is running"""
     print("Testing backend connection...")
     try:
-        response = requests.get(f"{BACKEND_URL}/api/cameras", timeout=5)
+        if isinstance(response, Exception):
+            raise response
         if response.status_code == 200:
             print("✓ Backend is running and responding")
             return True
         else:
             print(f"❌ Backend returned status code: {response.status_code}")
             return False
-    except requests.exceptions.ConnectionError:
+    except _get_requests().exceptions.ConnectionError:
         print("❌ Cannot connect to backend. Is it running?")
         print("   Start it with: ./start_backend.sh")
         return False
@@ -28,11 +83,12 @@ def test_backend_connection():
         print(f"❌ Error connecting to backend: {e}")
         return False
 
-def test_camera_detection():
+def check_camera_detection(response):
     """Test camera detection endpoint"""
     print("\nTesting camera detection...")
     try:
-        response = requests.get(f"{BACKEND_URL}/api/cameras", timeout=5)
+        if isinstance(response, Exception):
+            raise response
         if response.status_code == 200:
             cameras = response.json()
             print(f"✓ Camera detection endpoint working")
@@ -55,11 +111,12 @@ def test_camera_detection():
         print(f"❌ Error testing camera detection: {e}")
         return False
 
-def test_cors():
+def check_cors(response):
     """Test CORS headers"""
     print("\nTesting CORS configuration...")
     try:
-        response = requests.options(f"{BACKEND_URL}/api/cameras")
+        if isinstance(response, Exception):
+            raise response
         cors_header = response.headers.get('Access-Control-Allow-Origin')
         if cors_header:
             print(f"✓ CORS is configured: {cors_header}")
@@ -71,39 +128,51 @@ def test_cors():
         print(f"⚠️  Could not test CORS: {e}")
         return True
 
+# Written in one call instead of a print() per line
+FRONTEND_INSTRUCTIONS = "\n".join([
+    "\n" + SEPARATOR,
+    "Frontend Configuration",
+    SEPARATOR,
+    "\nThe frontend should connect to: http://localhost:5001",
+    "\nTo verify frontend configuration:",
+    "  1. Check frontend/src/components/EmotionDisplay.jsx",
+    "  2. Look for: const BACKEND_URL = 'http://localhost:5001'",
+    "\nTo start the frontend:",
+    "  ./start_frontend.sh",
+    "\nThen open your browser to: http://localhost:5173",
+]) + "\n"
+
 def print_frontend_instructions():
     """Print instructions for frontend"""
-    print("\n" + "="*60)
-    print("Frontend Configuration")
-    print("="*60)
-    print("\nThe frontend should connect to: http://localhost:5001")
-    print("\nTo verify frontend configuration:")
-    print("  1. Check frontend/src/components/EmotionDisplay.jsx")
-    print("  2. Look for: const BACKEND_URL = 'http://localhost:5001'")
-    print("\nTo start the frontend:")
-    print("  ./start_frontend.sh")
-    print("\nThen open your browser to: http://localhost:5173")
+    sys.stdout.write(FRONTEND_INSTRUCTIONS)
 
 def main():
     """Run all tests"""
-    print("="*60)
+    print(SEPARATOR)
     print("Web Backend Test Suite")
-    print("="*60)
+    print(SEPARATOR)
     
+    # (test, method, path) - the HTTP probes are independent, so they run concurrently
     tests = [
-        test_backend_connection,
-        test_camera_detection,
-        test_cors,
+        (check_backend_connection, 'GET', '/api/cameras'),
+        (check_camera_detection, 'GET', '/api/cameras'),
+        (check_cors, 'OPTIONS', '/api/cameras'),
     ]
     
+    session = _get_session()
+    with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+        futures = [executor.submit(_fetch, session, method, path) for _, method, path in tests]
+        responses = [future.result() for future in futures]
+    
+    # Report in the original order
     results = []
-    for test in tests:
-        result = test()
+    for (test, _, _), response in zip(tests, responses):
+        result = test(response)
         results.append(result)
     
-    print("\n" + "="*60)
+    print("\n" + SEPARATOR)
     print("Test Summary")
-    print("="*60)
+    print(SEPARATOR)
     passed = sum(results)
     total = len(results)
     print(f"Passed: {passed}/{total}")